@@ -4,9 +4,10 @@ Script to load sample bank transactions data into PostgreSQL database.
 Run this after the database is initialized to populate the transactions table.
 """
 
+import io
 import pandas as pd
 import psycopg2
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, Date, Time
 import os
 import logging
 
@@ -49,15 +50,28 @@ def load_sample_data():
                 raise FileNotFoundError(f"Could not find bank_transactions.csv in any expected location. Searched: {alternative_paths}")
         
         logger.info(f"Reading CSV data from: {csv_path}")
-        df = pd.read_csv(csv_path)
+        df = pd.read_csv(csv_path, parse_dates=['transaction_date'], date_format='%Y-%m-%d')
         
         # Convert date columns
-        df['transaction_date'] = pd.to_datetime(df['transaction_date']).dt.date
+        df['transaction_date'] = df['transaction_date'].dt.date
         df['transaction_time'] = pd.to_datetime(df['transaction_time'], format='%H:%M:%S').dt.time
         
         # Load data into PostgreSQL
         logger.info(f"Loading {len(df)} transactions into database...")
-        df.to_sql('transactions', engine, schema='public', if_exists='replace', index=False)
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        columns = ", ".join(f'"{column}"' for column in df.columns)
+        # Create the (empty) table, then bulk load rows with COPY, in one transaction so a failed
+        # COPY doesn't leave an empty replacement table behind. An empty frame can't show that the
+        # object columns hold dates/times, so their types are given explicitly.
+        with engine.begin() as conn:
+            df.head(0).to_sql(
+                'transactions', conn, schema='public', if_exists='replace', index=False,
+                dtype={'transaction_date': Date, 'transaction_time': Time},
+            )
+            with conn.connection.cursor() as cur:
+                cur.copy_expert(f"COPY public.transactions ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
         
         logger.info("Sample data loaded successfully!")
         
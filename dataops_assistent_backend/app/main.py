@@ -1,8 +1,11 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.routes import chat
 from app.routes import pipeline
-from shared.services.storage_service import MinioStorage
+from shared.services.storage_service import get_minio_storage
 from shared.services.database_service import get_database_service
 import logging
 
@@ -12,8 +15,10 @@ from shared.logging_config import setup_logging
 # Configure logging
 logger = setup_logging(level=logging.INFO)
 
+# Left as None when initialization fails, so shutdown can tell what was started
+storage_service = database_service = pipeline_registry_service = None
 try:
-    storage_service = MinioStorage()
+    storage_service = get_minio_storage()
     database_service = get_database_service()
     pipeline_registry_service = getPipelineRegistryService()
 except Exception as e:
@@ -23,10 +28,21 @@ except Exception as e:
 async def main(app: FastAPI):
     # Startup
     logger.info("Starting DataOps Assistant API...")
+    # Blocking Docker/storage calls go through asyncio.to_thread; the default executor
+    # (min(32, cpu + 4) threads) is too small when long container waits pile up
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=int(os.getenv("THREAD_POOL_SIZE", "64")), thread_name_prefix="dataops")
+    )
     try:
         # Initialize MinIO service and buckets
         await storage_service.initialize_pipeline_buckets()
         logger.info("MinIO service and pipeline buckets initialized successfully")
+
+        # Make sure the shared pipeline base image is available for image builds
+        if await pipeline.dockerize_service.ensure_base_image():
+            logger.info("Pipeline base image is available")
+        else:
+            logger.warning("Pipeline base image is not available; pipeline image builds may fail")
         
         # Test database connection asynchronously
         if await database_service.test_connection():
@@ -41,6 +57,8 @@ async def main(app: FastAPI):
     finally:
         # Shutdown
         logger.info("Shutting down DataOps Assistant API...")
+        if storage_service is not None:
+            await storage_service.close()
 
 app = FastAPI(
     title="DataOps Assistant API",
@@ -9,6 +9,8 @@ router = APIRouter()
 chat_service = ChatService()
 class ChatRequest(BaseModel):
     message: str
+    # False always asks the LLM for a fresh spec instead of reusing one from an earlier identical request
+    use_cache: bool = True
 
 @router.post("/")
 async def chat_endpoint(request: ChatRequest):
@@ -16,7 +18,7 @@ async def chat_endpoint(request: ChatRequest):
     Endpoint to handle chat requests.
     Delegates business logic to ChatService.
     """
-    result = await chat_service.process_message(request.message)
+    result = await chat_service.process_message(request.message, use_cache=request.use_cache)
 
     if result.get("guard_decision") == "block":
         raise HTTPException(status_code=400, detail=result)
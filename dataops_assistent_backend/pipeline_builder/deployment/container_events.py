@@ -0,0 +1,72 @@
+"""
+Container exit notifications from the Docker event stream.
+
+A single daemon thread follows "die" events for containers labelled app=dataops-assistant
+and resolves an asyncio future per container, so awaiting a container's exit doesn't
+hold a worker thread for the container's whole run.
+"""
+import time
+import asyncio
+import logging
+import threading
+from functools import lru_cache
+
+import docker
+
+# Only containers started by this service carry this label
+EVENT_FILTERS = {"event": "die", "label": "app=dataops-assistant"}
+
+
+class ContainerExitWatcher:
+    def __init__(self, client: docker.DockerClient, log):
+        self.client = client
+        self.log = log
+        self._waiters = {}  # container id -> (loop, future)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, container_id: str, loop: asyncio.AbstractEventLoop, future: asyncio.Future):
+        """
+        Resolve future (on loop) with the container's exit code when it dies.
+        Register before starting the container; safe to call from any thread.
+        """
+        with self._lock:
+            self._waiters[container_id] = (loop, future)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._follow, name="docker-events", daemon=True)
+                self._thread.start()
+
+    def unregister(self, container_id: str):
+        with self._lock:
+            self._waiters.pop(container_id, None)
+
+    def _follow(self):
+        # Replay from when we started, so a container that dies while the stream connects isn't missed
+        since = int(time.time())
+        while True:
+            try:
+                for event in self.client.events(decode=True, since=since, filters=EVENT_FILTERS):
+                    since = event.get("time", since)
+                    exit_code = int(event.get("Actor", {}).get("Attributes", {}).get("exitCode", -1))
+                    self._resolve(event.get("id"), exit_code)
+            except Exception as e:
+                self.log.warning(f"Docker event stream interrupted, reconnecting: {e}")
+                time.sleep(1)
+
+    def _resolve(self, container_id: str, exit_code: int):
+        with self._lock:
+            waiter = self._waiters.pop(container_id, None)
+        if waiter is not None:
+            loop, future = waiter
+            loop.call_soon_threadsafe(_set_result, future, exit_code)
+
+
+def _set_result(future: asyncio.Future, result):
+    if not future.done():
+        future.set_result(result)
+
+
+@lru_cache
+def get_container_exit_watcher(client: docker.DockerClient) -> ContainerExitWatcher:
+    """One watcher (and event-stream thread) per Docker client."""
+    return ContainerExitWatcher(client, logging.getLogger("dataops"))
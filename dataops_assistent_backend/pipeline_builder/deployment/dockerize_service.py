@@ -1,89 +1,289 @@
 import docker 
 import os
-import aiofiles
-import shutil
 import asyncio
-import json
+import hashlib
+import collections
+import io
+import logging
+import tarfile
+from functools import lru_cache
+from typing import List, Optional
+
+from ..deployment.pipeline_output_service import PipelineOutputService, _read_template
+from ..deployment.container_events import get_container_exit_watcher
+from shared.utils.proc import MAX_OUTPUT_LINES
+from shared.utils.json_utils import safe_json_bytes
+
+PIPELINE_BASE_IMAGE = "dataops-pipeline-base:latest"
+# Dependency stage of Dockerfile.template, tagged by hash of requirements.txt + template
+PIPELINE_DEPS_REPO = "pipeline-deps"
+# Optional registry image used as a layer cache across hosts/CI runs. The classic builder only
+# uses cache_from images that are present locally, so it is pulled before each pipeline build
+PIPELINE_CACHE_REF = os.getenv("PIPELINE_CACHE_REF")
+# HTTP connections to the Docker daemon; blocking SDK calls run concurrently on worker threads
+DOCKER_MAX_POOL_SIZE = int(os.getenv("DOCKER_MAX_POOL_SIZE", "32"))
+# Container log chunks per debug record
+LOG_BATCH_CHUNKS = 256
+# How long to wait for a container's "die" event before asking the daemon directly,
+# in case the event stream dropped it (e.g. while reconnecting)
+EXIT_EVENT_TIMEOUT_SECONDS = int(os.getenv("CONTAINER_EXIT_EVENT_TIMEOUT_SECONDS", "30"))
+# Image label holding the sha256 of the build context the image was built from
+CONTEXT_DIGEST_LABEL = "dataops.context-digest"
+
+
+@lru_cache
+def get_docker_client() -> docker.DockerClient:
+    """Process-wide Docker client shared by every DockerizeService."""
+    return docker.from_env(max_pool_size=DOCKER_MAX_POOL_SIZE)
+
+
+def _tar_files(files: dict) -> bytes:
+    """Pack {file name: text or bytes} into an in-memory tar archive; same files, same bytes."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for name, content in files.items():
+            data = content.encode("utf-8") if isinstance(content, str) else content
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = 0
+            info.mode = 0o644
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
 
-from ..deployment.pipeline_output_service import PipelineOutputService
 
 class DockerizeService:
     """Service to dockerize pipeline deployments."""
     def __init__(self, log):
         self.log = log
         self.output_service = PipelineOutputService()
-        self.docker_client = docker.from_env()
+        self.docker_client = get_docker_client()
+        self._exit_watcher = get_container_exit_watcher(self.docker_client)
         self.network_name = "dataops-assistant-net"
         self.env_test_template_path = os.path.join(os.path.dirname(__file__), "../testing/.env.test_template")
+        self._env_test_template = _read_template(self.env_test_template_path)
         self.host_data_path = os.getenv("HOST_DATA_PATH", "/Users/yourusername/project/data")
         self.host_output_path = os.getenv("HOST_OUTPUT_PATH", "/Users/yourusername/project/output")
+        # Host mounts for pipeline containers; the paths don't change, so resolve them once
+        self.host_data_abs = os.path.abspath(self.host_data_path)
+        self.host_output_abs = os.path.abspath(self.host_output_path)
+        self._pipeline_volumes = {
+            self.host_data_abs: {"bind": "/app/data", "mode": "ro"},
+            self.host_output_abs: {"bind": "/app/output", "mode": "rw"},
+        }
+        self.base_image_context = os.getenv("PIPELINE_BASE_IMAGE_CONTEXT", "/app/base_pipeline_image")
 
-    async def test_pipeline_in_docker(self, pipeline_id: str) -> dict:
+    def _build_image(self, **build_kwargs) -> str:
         """
-        Use the test-runner image to run tests for the given pipeline_id.
-        Copies pipeline files to a temp dir, mounts it into the test-runner container, and runs pytest.
+        Run a docker build through the low-level API (blocking; call via asyncio.to_thread),
+        logging progress as the daemon streams it. Returns the built image ID.
+        """
+        image_id = None
+        for chunk in self.docker_client.api.build(decode=True, **build_kwargs):
+            if 'error' in chunk:
+                raise docker.errors.BuildError(chunk['error'], [])
+            if 'stream' in chunk:
+                self.log.debug(chunk['stream'].strip())
+            elif 'ID' in chunk.get('aux', {}):
+                image_id = chunk['aux']['ID']
+            else:
+                self.log.debug(chunk)
+        if image_id is None:
+            image_id = self.docker_client.images.get(build_kwargs['tag']).id
+        return image_id
+
+    async def _run_to_completion(self, files: Optional[dict] = None, files_dest: Optional[str] = None, **create_kwargs) -> tuple:
+        """
+        Create a container, copy files ({name: text}) into files_dest, start it, wait for it
+        to exit, collect its logs and remove it.
+        The exit is awaited through the Docker event stream, so no worker thread is held while the container runs.
+        Returns (container id, exit code, decoded logs); only the last MAX_OUTPUT_LINES log lines are kept.
         """
-        import tempfile
+        loop = asyncio.get_running_loop()
+        exited = loop.create_future()
+        container = await asyncio.to_thread(self._start_container, loop, exited, files, files_dest, **create_kwargs)
         try:
-            stored_files = await self.output_service.get_pipeline_files(pipeline_id)
-            if not stored_files:
-                self.log.error(f"No files found for pipeline ID: {pipeline_id}")
-                return {"success": False, "details": "No files found for the given pipeline ID."}
+            exit_code = await self._wait_for_exit(container, exited)
+            logs = await asyncio.to_thread(self._collect_logs, container)
+            return container.id, exit_code, logs
+        finally:
+            self._exit_watcher.unregister(container.id)
+            await asyncio.to_thread(container.remove, force=True)
+
+    async def _wait_for_exit(self, container, exited: asyncio.Future) -> int:
+        """
+        Wait for the container's exit code from the event stream, checking the container's state
+        every EXIT_EVENT_TIMEOUT_SECONDS so a missed event can't hang the caller.
+        """
+        while True:
+            try:
+                return await asyncio.wait_for(asyncio.shield(exited), EXIT_EVENT_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.to_thread(container.reload)
+            if container.status in ("exited", "dead"):
+                self.log.warning(f"No exit event for container {container.id}; using its reported state")
+                return int(container.attrs.get("State", {}).get("ExitCode", -1))
+
+    def _start_container(self, loop, exited: asyncio.Future, files: Optional[dict], files_dest: Optional[str], **create_kwargs):
+        """Create, populate and start a container, with exited registered for its exit (blocking)."""
+        image = create_kwargs.pop('image')
+        try:
+            container = self.docker_client.containers.create(image, detach=True, **create_kwargs)
+        except docker.errors.ImageNotFound:
+            self.docker_client.images.pull(image)
+            container = self.docker_client.containers.create(image, detach=True, **create_kwargs)
+        try:
+            if files:
+                # Straight into the container's filesystem; no volume or helper container needed
+                container.put_archive(files_dest, _tar_files(files))
+            # Register before starting so even an instant exit is seen
+            self._exit_watcher.register(container.id, loop, exited)
+            container.start()
+        except Exception:
+            self._exit_watcher.unregister(container.id)
+            container.remove(force=True)
+            raise
+        self.log.info(f"Started container from image {image}, Container ID: {container.id}")
+        return container
+
+    def _collect_logs(self, container) -> str:
+        """
+        Stream the tail of an exited container's logs (blocking). When debug logging is on,
+        chunks are forwarded in batches of LOG_BATCH_CHUNKS so a chatty container produces
+        a few large records rather than one per line.
+        """
+        tail = collections.deque(maxlen=MAX_OUTPUT_LINES)
+        debug = self.log.isEnabledFor(logging.DEBUG)
+        pending = []
+        for chunk in container.logs(stream=True, tail=MAX_OUTPUT_LINES):
+            tail.append(chunk)
+            if debug:
+                pending.append(chunk)
+                if len(pending) >= LOG_BATCH_CHUNKS:
+                    self.log.debug(b"".join(pending).rstrip().decode('utf-8', errors='replace'))
+                    pending.clear()
+        if pending:
+            self.log.debug(b"".join(pending).rstrip().decode('utf-8', errors='replace'))
+        return b"".join(tail).decode('utf-8', errors='replace')
+
+    def _remove_container(self, name: str):
+        """Force-remove the container with this name if there is one (blocking). Never raises."""
+        try:
+            self.docker_client.containers.get(name).remove(force=True)
+            self.log.info(f"Removed existing container with name: {name}")
+        except docker.errors.NotFound:
+            pass  # Container does not exist, continue
         except Exception as e:
-            self.log.error(f"Failed to retrieve pipeline files: {e}")
-            return {"success": False, "details": f"Failed to retrieve pipeline files: {e}"}
+            self.log.warning(f"Failed to remove existing container {name}: {e}")
 
-        self.log.info(f"Retrieved files for pipeline ID: {pipeline_id}")
+    async def ensure_base_image(self) -> bool:
+        """
+        Make sure the shared pipeline base image exists, building it once if it is missing.
+        Pipeline images are built FROM it, so per-pipeline builds only copy code.
+        """
+        try:
+            await asyncio.to_thread(self.docker_client.images.get, PIPELINE_BASE_IMAGE)
+            return True
+        except docker.errors.ImageNotFound:
+            pass
+        except Exception as e:
+            self.log.error(f"Failed to inspect base image {PIPELINE_BASE_IMAGE}: {e}")
+            return False
+
+        if not os.path.isdir(self.base_image_context):
+            self.log.warning(f"Base image {PIPELINE_BASE_IMAGE} not found and no build context at {self.base_image_context}")
+            return False
 
-        # Use a named Docker volume 'pipeline-test' for /app/pipeline
+        self.log.info(f"Building base image {PIPELINE_BASE_IMAGE} from {self.base_image_context}...")
         try:
-            # Ensure the volume exists
-            volume_name = "pipeline-test"
-            try:
-                self.docker_client.volumes.get(volume_name)
-            except docker.errors.NotFound:
-                self.docker_client.volumes.create(name=volume_name)
-
-            import tempfile
-            from shared.copy_to_volume import copy_to_volume
-            # Create a temp dir and write the files to it
-            with tempfile.TemporaryDirectory() as temp_dir:
-                with open(os.path.join(temp_dir, "pipeline.py"), "w") as f:
-                    f.write(stored_files.get('pipeline', ''))
-                with open(os.path.join(temp_dir, "test.py"), "w") as f:
-                    f.write(stored_files.get('test_code', ''))
-                with open(os.path.join(temp_dir, "requirements.txt"), "w") as f:
-                    f.write(stored_files.get('requirements', ''))
-                with open(os.path.join(temp_dir, ".env"), "w") as f:
-                    f.write(open(self.env_test_template_path, "r").read())
-                # Copy all files in temp_dir to the volume
-                copy_to_volume(volume_name, temp_dir, dest_path="/app/pipeline")
-            self.log.info(f"Pipeline test files written to Docker volume: {volume_name}")
+            await asyncio.to_thread(
+                self._build_image,
+                path=self.base_image_context,
+                dockerfile="base.Dockerfile",
+                tag=PIPELINE_BASE_IMAGE,
+                rm=True,
+            )
+            self.log.info(f"Base image {PIPELINE_BASE_IMAGE} built successfully")
+            return True
         except Exception as e:
-            self.log.error(f"Failed to write pipeline test files to Docker volume: {e}")
-            return {"success": False, "details": f"Failed to write pipeline test files to Docker volume: {e}"}
+            self.log.error(f"Failed to build base image {PIPELINE_BASE_IMAGE}: {e}")
+            return False
 
-        # Run the test-runner container with the named volume mounted
+    async def _ensure_deps_image(self, context: bytes, requirements: str, dockerfile_content: str) -> dict:
+        """
+        Return the tag of the dependency image for these requirements, building the
+        template's deps stage only when no image with that tag exists yet.
+        """
+        digest = hashlib.sha256((requirements + "\0" + dockerfile_content).encode()).hexdigest()
+        deps_tag = f"{PIPELINE_DEPS_REPO}:{digest[:12]}"
+        try:
+            await asyncio.to_thread(self.docker_client.images.get, deps_tag)
+            self.log.info(f"Reusing dependency image {deps_tag}")
+            return {"success": True, "tag": deps_tag}
+        except docker.errors.ImageNotFound:
+            pass
+
+        self.log.info(f"Building dependency image {deps_tag}...")
         try:
-            container = await asyncio.to_thread(
-                self.docker_client.containers.run,
+            await asyncio.to_thread(
+                self._build_image,
+                fileobj=io.BytesIO(context),
+                custom_context=True,
+                tag=deps_tag,
+                target="deps",
+                rm=True,
+                forcerm=True,
+                pull=False,
+                cache_from=[PIPELINE_BASE_IMAGE, deps_tag],
+            )
+            return {"success": True, "tag": deps_tag}
+        except Exception as e:
+            self.log.error(f"Failed to build dependency image {deps_tag}: {e}")
+            return {"success": False, "details": f"Failed to build dependency image: {e}"}
+
+    async def _fetch_pipeline_files(self, pipeline_id: str, file_types: List[str]) -> dict:
+        """
+        Load the given stored file types (plus metadata) as {"success": True, "files": {...}},
+        or an error result. Specs, test results and logs are never downloaded here.
+        """
+        try:
+            stored_files = await self.output_service.get_pipeline_files(pipeline_id, file_types=file_types)
+        except Exception as e:
+            self.log.error(f"Failed to retrieve pipeline files: {e}")
+            return {"success": False, "details": f"Failed to retrieve pipeline files: {e}"}
+        if not stored_files:
+            self.log.error(f"No files found for pipeline ID: {pipeline_id}")
+            return {"success": False, "details": "No files found for the given pipeline ID."}
+        return {"success": True, "files": stored_files}
+
+    async def test_pipeline_in_docker(self, pipeline_id: str) -> dict:
+        """
+        Use the test-runner image to run tests for the given pipeline_id.
+        Copies the pipeline files into a test-runner container and runs pytest.
+        """
+        fetched = await self._fetch_pipeline_files(pipeline_id, ["pipeline", "test_code", "requirements"])
+        if not fetched["success"]:
+            return fetched
+        stored_files = fetched["files"]
+        self.log.info(f"Retrieved files for pipeline ID: {pipeline_id}")
+
+        # Run the test-runner container with the pipeline files copied into /app/pipeline
+        try:
+            container_id, exit_code, logs = await self._run_to_completion(
+                files={
+                    "pipeline.py": stored_files.get('pipeline', ''),
+                    "test.py": stored_files.get('test_code', ''),
+                    "requirements.txt": stored_files.get('requirements', ''),
+                    ".env": self._env_test_template,
+                },
+                files_dest="/app/pipeline",
                 image="dataops-assistant-test-runner:latest",
                 command=["pytest", "/app/pipeline/test.py"],
-                volumes={
-                    volume_name: {"bind": "/app/pipeline", "mode": "rw"}
-                },
                 working_dir="/app/pipeline",
-                detach=True,
                 network=self.network_name,
                 labels={"app": "dataops-assistant", "pipeline_id": pipeline_id},
             )
-            self.log.info(f"Started test-runner container for pipeline ID: {pipeline_id}, Container ID: {container.id}")
-            await asyncio.to_thread(container.wait)
-            logs = await asyncio.to_thread(container.logs)
-            logs = logs.decode('utf-8')
-            self.log.info(f"Test-runner container logs:\n{logs}")
-            exit_code = container.attrs['State']['ExitCode']
-            await asyncio.to_thread(container.remove, force=True)
+            self.log.info(f"Test-runner container {container_id} for pipeline ID {pipeline_id} logs:\n{logs}")
             if exit_code == 0:
                 return {"success": True, "details": "All tests passed", "logs": logs}
             else:
@@ -92,89 +292,124 @@ class DockerizeService:
             self.log.error(f"Failed to run test-runner container: {e}")
             return {"success": False, "details": f"Failed to run test-runner container: {e}"}
 
-    async def dockerize_pipeline_v2(self, pipeline_id: str) -> dict:
+    async def _build_pipeline_image(self, pipeline_id: str, image_tag: str, context: bytes,
+                                    requirements: str, dockerfile_content: str) -> dict:
         """
-        Build and start a pipeline container, returning the container ID. Reuses build context if it exists.
+        Build the pipeline image from an in-memory context, or reuse the existing image_tag
+        when it was built from byte-identical context.
         """
-        import aiofiles
-        build_dir = f"/tmp/pipeline_builds/{pipeline_id}"
-        os.makedirs(build_dir, exist_ok=True)
+        context_digest = hashlib.sha256(context).hexdigest()
         try:
-            stored_files = await self.output_service.get_pipeline_files(pipeline_id)
-            if not stored_files:
-                self.log.error(f"No files found for pipeline ID: {pipeline_id}")
-                return {"success": False, "details": "No files found for the given pipeline ID."}
+            image = await asyncio.to_thread(self.docker_client.images.get, image_tag)
+            if image.labels.get(CONTEXT_DIGEST_LABEL) == context_digest:
+                self.log.info(f"Reusing image {image_tag}; build context unchanged")
+                return {"success": True, "image_id": image.id}
+        except docker.errors.ImageNotFound:
+            pass
         except Exception as e:
-            self.log.error(f"Failed to retrieve pipeline files: {e}")
-            return {"success": False, "details": f"Failed to retrieve pipeline files: {e}"}
+            self.log.warning(f"Failed to inspect image {image_tag}, rebuilding: {e}")
 
-        # Write pipeline files to build context
-        pipeline_file = os.path.join(build_dir, "pipeline.py")
-        dockerfile_path = os.path.join(build_dir, "Dockerfile")
-        metadata_file = os.path.join(build_dir, "metadata.json")   
-
-        async with aiofiles.open(pipeline_file, 'w') as f:
-            await f.write(stored_files.get('pipeline', ''))
-        # Write metadata file
-        async with aiofiles.open(metadata_file, 'w') as f:
-            await f.write(json.dumps(stored_files.get('metadata', '')))
-
-        # Generate Dockerfile from template
-        template_path = os.path.join(os.path.dirname(__file__), "Dockerfile.template")
-        with open(template_path, "r") as tpl:
-            dockerfile_content = tpl.read()
-        with open(dockerfile_path, "w") as df:
-            df.write(dockerfile_content)
-
-        # Build the Docker image
-        image_tag = f"pipeline-{pipeline_id}:latest"
+        # Build (or reuse) the dependency image shared by pipelines with the same requirements,
+        # while the registry cache image (if configured) is pulled
+        deps_result, cache_ref_pulled = await asyncio.gather(
+            self._ensure_deps_image(context, requirements, dockerfile_content),
+            asyncio.to_thread(self._pull_cache_ref),
+        )
+        if not deps_result["success"]:
+            return deps_result
+
+        # Build the Docker image, reusing layers from the dependency image, the previous
+        # build of this pipeline and the registry cache image when it could be pulled
+        cache_from = [deps_result["tag"], PIPELINE_BASE_IMAGE, image_tag]
+        if cache_ref_pulled:
+            cache_from.append(PIPELINE_CACHE_REF)
         try:
-            image, logs = self.docker_client.images.build(
-                path=build_dir,
+            # Blocking for the whole build, so keep it off the event loop
+            image_id = await asyncio.to_thread(
+                self._build_image,
+                fileobj=io.BytesIO(context),
+                custom_context=True,
                 tag=image_tag,
                 rm=True,
                 forcerm=True,
                 pull=False,
+                cache_from=cache_from,
+                labels={CONTEXT_DIGEST_LABEL: context_digest},
             )
-            for log in logs:
-                if 'stream' in log:
-                    self.log.debug(log['stream'].strip())
-                else:
-                    self.log.debug(log)
             self.log.info(f"Docker image built successfully for pipeline ID: {pipeline_id}")
+            return {"success": True, "image_id": image_id}
         except Exception as e:
             self.log.error(f"Failed to build Docker image: {e}")
             return {"success": False, "details": f"Failed to build Docker image: {e}"}
 
-        # Start the container and return its ID
-   
-        container_name = f"pipeline_{pipeline_id}_container"
+    def _pull_cache_ref(self) -> bool:
+        """Pull PIPELINE_CACHE_REF so the build can use it as a cache source (blocking). Never raises."""
+        if not PIPELINE_CACHE_REF:
+            return False
         try:
-            # Remove existing container with the same name if it exists
-            try:
-                existing_container = await asyncio.to_thread(self.docker_client.containers.get, container_name)
-                await asyncio.to_thread(existing_container.remove, force=True)
-                self.log.info(f"Removed existing container with name: {container_name}")
-            except Exception:
-                pass  # Container does not exist, continue
-
-            container = await asyncio.to_thread(
-                self.docker_client.containers.create,
+            self.docker_client.images.pull(PIPELINE_CACHE_REF)
+            return True
+        except Exception as e:
+            self.log.warning(f"Failed to pull build cache image {PIPELINE_CACHE_REF}, building without it: {e}")
+            return False
+
+    async def dockerize_pipeline_v2(self, pipeline_id: str) -> dict:
+        """
+        Build the pipeline image and check a container can be created from it, returning the image ID.
+        The build context is assembled in memory; nothing is written to disk.
+        """
+        try:
+            # The Dockerfile template doesn't depend on the stored files, so load it while they are fetched
+            fetched, dockerfile_content = await asyncio.gather(
+                self._fetch_pipeline_files(pipeline_id, ["pipeline", "requirements"]),
+                asyncio.to_thread(self.output_service.render_dockerfile),
+            )
+            if not fetched["success"]:
+                return fetched
+            stored_files = fetched["files"]
+
+            context = _tar_files({
+                "pipeline.py": stored_files.get('pipeline', ''),
+                "requirements.txt": stored_files.get('requirements', ''),
+                "metadata.json": safe_json_bytes(stored_files.get('metadata', '')),
+                "Dockerfile": dockerfile_content,
+            })
+        except Exception as e:
+            self.log.error(f"Failed to prepare Docker build context: {e}")
+            return {"success": False, "details": f"Failed to prepare Docker build context: {e}"}
+
+        # A leftover container with this name only matters at create time, so clear it
+        # while the images build
+        container_name = f"pipeline_{pipeline_id}_container"
+        stale_removal = asyncio.create_task(asyncio.to_thread(self._remove_container, container_name))
+
+        image_tag = f"pipeline-{pipeline_id}:latest"
+        build_result = await self._build_pipeline_image(
+            pipeline_id, image_tag, context, stored_files.get('requirements', ''), dockerfile_content
+        )
+        if not build_result["success"]:
+            return build_result
+        image_id = build_result["image_id"]
+
+        # Start the container and return its ID
+        def create_and_discard() -> str:
+            container = self.docker_client.containers.create(
                 image_tag,
                 detach=True,
                 network=self.network_name,
                 name=container_name,
-                volumes={
-                    os.path.abspath(self.host_data_path): {"bind": "/app/data", "mode": "ro"},
-                    os.path.abspath(self.host_output_path): {"bind": "/app/output", "mode": "rw"},
-                },
+                volumes=self._pipeline_volumes,
                 labels={"app": "dataops-assistant", "pipeline_id": pipeline_id},
             )
-            self.log.info(f"Docker container created for pipeline ID: {pipeline_id}, Container ID: {container.id}")
             # Remove the container immediately after creation (test only)
-            await asyncio.to_thread(container.remove, force=True)
-            self.log.info(f"Docker container removed for pipeline ID: {pipeline_id}, Container ID: {container.id}")
-            return {"success": True, "image_id": image.id}
+            container.remove(force=True)
+            return container.id
+
+        try:
+            await stale_removal
+            container_id = await asyncio.to_thread(create_and_discard)
+            self.log.info(f"Docker container created and removed for pipeline ID: {pipeline_id}, Container ID: {container_id}")
+            return {"success": True, "image_id": image_id}
         except Exception as e:
             self.log.error(f"Failed to create/remove Docker container: {e}")
             return {"success": False, "details": f"Failed to create/remove Docker container: {e}"}
@@ -185,24 +420,13 @@ class DockerizeService:
         Given an image ID, create and run a new container, wait for it to finish, and return the logs and exit status.
         """
         try:
-            container = await asyncio.to_thread(
-                self.docker_client.containers.run,
-                image_id,
-                detach=True,
+            container_id, exit_code, logs = await self._run_to_completion(
+                image=image_id,
                 network=self.network_name,
-                    volumes={
-                        os.path.abspath(self.host_data_path): {"bind": "/app/data", "mode": "ro"},
-                        os.path.abspath(self.host_output_path): {"bind": "/app/output", "mode": "rw"},
-                    },
+                volumes=self._pipeline_volumes,
                 labels={"app": "dataops-assistant"},
             )
-            self.log.info(f"Started container from image {image_id}, Container ID: {container.id}")
-            await asyncio.to_thread(container.wait)
-            logs = await asyncio.to_thread(container.logs)
-            logs = logs.decode('utf-8')
-            exit_code = container.attrs['State']['ExitCode']
-            self.log.info(f"Container logs:\n{logs}")
-            await asyncio.to_thread(container.remove, force=True)
+            self.log.info(f"Container {container_id} logs:\n{logs}")
             if exit_code == 0:
                 return {"success": True, "details": "Pipeline ran successfully", "logs": logs}
             else:
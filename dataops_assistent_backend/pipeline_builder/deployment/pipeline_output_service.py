@@ -3,12 +3,20 @@ import os
 import logging
 import datetime
 import uuid
-import json
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Callable
 from shared.services.storage_factory import get_storage_service
+from shared.utils.json_utils import safe_json_dumps
 from ..types import CodeGenResult
 
 
+@lru_cache(maxsize=None)
+def _read_template(path: str) -> str:
+    """Templates ship with the code and don't change at runtime, so each is read once."""
+    with open(path, "r") as f:
+        return f.read()
+
+
 class PipelineOutputService:
     """
     Service responsible for creating and managing pipeline output files.
@@ -50,7 +58,7 @@ class PipelineOutputService:
 
             def ensure_str(val):
                 if isinstance(val, dict):
-                    return json.dumps(val, indent=2)
+                    return safe_json_dumps(val, indent=True)
                 return str(val)
 
             pipeline_data = {
@@ -92,8 +100,7 @@ class PipelineOutputService:
             str: Content of the .env.template file
         """
         try:
-            with open(self.env_template_path, "r") as f:
-                return f.read()
+            return _read_template(self.env_template_path)
         except Exception as e:
             self.log.error(f"Failed to read .env template: {e}")
 
@@ -105,22 +112,31 @@ class PipelineOutputService:
             str: Content of the Dockerfile.template file
         """
         try:
-            with open(self.dockerfile_template_path, "r") as f:
-                return f.read()
+            return self.render_dockerfile()
         except Exception as e:
             self.log.error(f"Failed to read Dockerfile template: {e}")
 
-    async def get_pipeline_files(self, pipeline_id: str) -> Dict[str, str]:
+    def render_dockerfile(self) -> str:
+        """
+        Returns the pipeline Dockerfile text. The template is read from disk once per process.
+
+        Returns:
+            str: Dockerfile content
+        """
+        return _read_template(self.dockerfile_template_path)
+
+    async def get_pipeline_files(self, pipeline_id: str, file_types: Optional[List[str]] = None) -> Dict[str, str]:
         """
         Retrieves the pipeline files from configured storage service.
 
         Args:
             pipeline_id: Unique ID of the pipeline
+            file_types: Stored file types to fetch (e.g. ["pipeline", "requirements"]); all when None
         Returns:
             Dict[str, str]: Dictionary containing the content of the pipeline files
         """
         try:
-            stored_files = await self.storage_service.retrieve_pipeline(pipeline_id)
+            stored_files = await self.storage_service.retrieve_pipeline(pipeline_id, file_types=file_types)
             if not stored_files:
                 self.log.error(f"No files found for pipeline ID: {pipeline_id}")
                 return {}
@@ -128,3 +144,18 @@ class PipelineOutputService:
         except Exception as e:
             self.log.error(f"Failed to retrieve pipeline files: {e}")
             return {}
+
+    async def download_pipeline_files(self, pipeline_id: str, dest_dir: str, files: Dict[str, str],
+                                      on_file: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Streams selected pipeline files from the configured storage service into dest_dir.
+
+        Args:
+            pipeline_id: Unique ID of the pipeline
+            dest_dir: Directory to write the files into
+            files: Mapping of stored file type to target file name
+            on_file: Optional callback invoked with each file type once it is written
+        Returns:
+            Dict[str, Any]: The pipeline's version metadata
+        """
+        return await self.storage_service.retrieve_pipeline_to_dir(pipeline_id, dest_dir, files, on_file=on_file)
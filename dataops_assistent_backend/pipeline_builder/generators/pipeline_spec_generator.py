@@ -1,6 +1,44 @@
-import json
-from shared.services.llm_service import LLMService
+import os
+import re
+import time
+import logging
+import sqlite3
+import asyncio
+import hashlib
 import datetime
+import tempfile
+
+import orjson
+
+from shared.services.llm_service import LLMService, RESPONSES_MODEL, RESPONSES_TEMPERATURE
+from shared.utils.json_utils import safe_json_dumps
+
+# Specs from successful builds are kept on disk by request, so repeating a request skips the LLM round trip.
+# SQLite so several server/CLI processes can share the file.
+SPEC_CACHE_PATH = os.getenv("SPEC_CACHE_PATH", os.path.join(tempfile.gettempdir(), "dataops_spec_cache.sqlite3"))
+SPEC_CACHE_TTL_SECONDS = int(os.getenv("SPEC_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+
+# generate_spec appends this to pipeline_name; cached specs are stored without it
+_NAME_TIMESTAMP_SUFFIX = re.compile(r"_\d{8}_\d{4}$")
+
+SPEC_PROMPT = """
+            Extract pipeline configuration from this request: {user_input}
+            
+            Focus on identifying:
+            - Data source type and location (file path, table name, API endpoint)
+            - Data destination type and name (table name, file name)
+            - Any specific transformation requirements
+            - Schedule requirements
+            
+            For transformation_logic, extract only the specific business logic needed (e.g., 'filter active users', 'calculate monthly totals').
+            If no transformation is specified, leave it empty.
+            
+            For required fields that aren't specified:
+            - source_path is REQUIRED for localFileCSV, localFileJSON, and api sources
+            - source_table is REQUIRED for PostgreSQL sources  
+            - Set schedule to '0 0 * * *' (daily at midnight) if not specified
+            - For file sources without explicit paths, suggest reasonable defaults like 'data/input.csv'
+            """
 
 
 ETL_SPEC_SCHEMA = {
@@ -49,6 +87,13 @@ ETL_SPEC_SCHEMA = {
     "required": ["pipeline_name", "source_type", "source_path", "source_table", "destination_type", "destination_name", "transformation_logic", "schedule", "description"],
     "additionalProperties": False,
 }
+
+# Cached specs are only valid for the prompt and schema that produced them
+SPEC_CACHE_VERSION = hashlib.blake2b(
+    SPEC_PROMPT.encode() + orjson.dumps(ETL_SPEC_SCHEMA, option=orjson.OPT_SORT_KEYS), digest_size=8
+).hexdigest()
+
+
 class PipelineSpecGenerator:
     """
     Service for generating pipeline specifications (specs) for ML/data pipelines.
@@ -57,34 +102,35 @@ class PipelineSpecGenerator:
         self.log = logger
         self.llm = LLMService()
 
-    async def generate_spec(self, user_input: str) -> dict:
+    async def generate_spec(self, user_input: str, use_cache: bool = True) -> dict:
         """
         Generate a pipeline specification from user input.
         Now focuses on configuration extraction rather than full code generation.
         Args:
             user_input (str): Description or requirements for the pipeline.
+            use_cache (bool): Reuse the spec of an earlier successful build of the same request, if any.
         Returns:
             dict: A dictionary representing the pipeline specification.
         """
-        try:
-            prompt = f"""
-            Extract pipeline configuration from this request: {user_input}
-            
-            Focus on identifying:
-            - Data source type and location (file path, table name, API endpoint)
-            - Data destination type and name (table name, file name)
-            - Any specific transformation requirements
-            - Schedule requirements
-            
-            For transformation_logic, extract only the specific business logic needed (e.g., 'filter active users', 'calculate monthly totals').
-            If no transformation is specified, leave it empty.
+        # Only deterministic completions are worth reusing
+        use_cache = use_cache and RESPONSES_TEMPERATURE == 0
+        spec = await asyncio.to_thread(self._cache_get, self._cache_key(user_input)) if use_cache else None
+        if spec is not None:
+            self.log.info("Reusing cached spec for this request")
+        else:
+            spec = await self._request_spec(user_input)
+
+        # Add timestamp to pipeline name
+        date_str = datetime.datetime.now().strftime('%Y%m%d_%H%M')
+        if 'pipeline_name' in spec:
+            spec['pipeline_name'] = f"{spec['pipeline_name']}_{date_str}"
             
-            For required fields that aren't specified:
-            - source_path is REQUIRED for localFileCSV, localFileJSON, and api sources
-            - source_table is REQUIRED for PostgreSQL sources  
-            - Set schedule to '0 0 * * *' (daily at midnight) if not specified
-            - For file sources without explicit paths, suggest reasonable defaults like 'data/input.csv'
-            """
+        return spec
+
+    async def _request_spec(self, user_input: str) -> dict:
+        """Ask the LLM for a spec and check its source-specific required fields."""
+        try:
+            prompt = SPEC_PROMPT.format(user_input=user_input)
             
             response = await self.llm.response_create_async(
                 input = prompt,
@@ -102,19 +148,67 @@ class PipelineSpecGenerator:
 
         
 
-        spec = json.loads(response.output_text)
+        spec = orjson.loads(response.output_text)
 
-        self.log.info("Generated spec:\n%s", json.dumps(spec, indent=2))
+        if self.log.isEnabledFor(logging.INFO):
+            self.log.info("Generated spec:\n%s", safe_json_dumps(spec, indent=True))
 
         # Validate required fields based on source type
         self._validate_spec_requirements(spec)
+        return spec
 
-        # Add timestamp to pipeline name
-        date_str = datetime.datetime.now().strftime('%Y%m%d_%H%M')
+    async def remember_spec(self, user_input: str, spec: dict) -> None:
+        """Cache the spec of a successful build so the same request can skip the LLM next time."""
+        if RESPONSES_TEMPERATURE != 0:
+            return
+        spec = dict(spec)
         if 'pipeline_name' in spec:
-            spec['pipeline_name'] = f"{spec['pipeline_name']}_{date_str}"
-            
-        return spec
+            spec['pipeline_name'] = _NAME_TIMESTAMP_SUFFIX.sub("", spec['pipeline_name'])
+        await asyncio.to_thread(self._cache_set, self._cache_key(user_input), spec)
+
+    def _cache_key(self, user_input: str) -> str:
+        # Whitespace is normalized but case is kept, since paths and table names are case-sensitive
+        normalized = " ".join(user_input.split())
+        return hashlib.blake2b(
+            f"{normalized}|{RESPONSES_MODEL}|{RESPONSES_TEMPERATURE}|{SPEC_CACHE_VERSION}".encode(), digest_size=16
+        ).hexdigest()
+
+    def _connect_cache(self):
+        conn = sqlite3.connect(SPEC_CACHE_PATH, timeout=5)
+        conn.execute("CREATE TABLE IF NOT EXISTS specs (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, spec BLOB NOT NULL)")
+        return conn
+
+    def _cache_get(self, key: str):
+        # The cache is only an optimization: any failure is treated as a miss
+        try:
+            conn = self._connect_cache()
+            try:
+                row = conn.execute(
+                    "SELECT spec FROM specs WHERE key = ? AND stored_at >= ?",
+                    (key, time.time() - SPEC_CACHE_TTL_SECONDS),
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self.log.warning(f"Spec cache unavailable at {SPEC_CACHE_PATH}: {e}")
+            return None
+        return orjson.loads(row[0]) if row else None
+
+    def _cache_set(self, key: str, spec: dict) -> None:
+        try:
+            conn = self._connect_cache()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO specs (key, stored_at, spec) VALUES (?, ?, ?)",
+                        (key, time.time(), orjson.dumps(spec)),
+                    )
+                    # Expired entries are never served, so drop them while we're writing anyway
+                    conn.execute("DELETE FROM specs WHERE stored_at < ?", (time.time() - SPEC_CACHE_TTL_SECONDS,))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            self.log.warning(f"Spec cache unavailable at {SPEC_CACHE_PATH}: {e}")
 
     def _validate_spec_requirements(self, spec: dict) -> None:
         """Validate that required fields are present based on source type."""
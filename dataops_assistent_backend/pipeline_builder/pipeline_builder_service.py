@@ -1,9 +1,10 @@
-import json
+import asyncio
 import logging
-import jsonschema
-import datetime
+import fastjsonschema
+import time
 from yaspin import yaspin
-from shared.utils.spinner_utils import run_step_with_spinner
+from shared.utils.spinner_utils import StepSpinner
+from shared.utils.json_utils import safe_json_dumps
 import logging
 
 from shared.services.llm_service import LLMService
@@ -20,6 +21,12 @@ from .sources.source_service import SourceService
 from .deployment.dockerize_service import DockerizeService
 from .deployment.scheduler_service import SchedulerService
 
+# ETL_SPEC_SCHEMA is static, so compile it once into a plain validation function
+_validate_spec = fastjsonschema.compile(ETL_SPEC_SCHEMA)
+
+# Required source_path extension per file source type
+_SOURCE_SUFFIX = {"localFileCSV": ".csv", "localFileJSON": ".jsonl"}
+
 class PipelineBuilderService:
     def __init__(self):
         self.log = logging.getLogger("dataops")
@@ -37,71 +44,93 @@ class PipelineBuilderService:
 
 
     async def validate_spec_schema(self, spec: dict) -> bool:
-        # Validate spec against ETL_SPEC_SCHEMA using jsonschema
+        # Validate spec against ETL_SPEC_SCHEMA using the compiled validator
         try:
-            jsonschema.validate(instance=spec, schema=ETL_SPEC_SCHEMA)
+            _validate_spec(spec)
             return self.validate_source_path(spec)
         except ImportError:
-            print("jsonschema package is not installed.")
+            print("fastjsonschema package is not installed.")
             return False
-        except jsonschema.ValidationError as e:
+        except fastjsonschema.JsonSchemaException as e:
             print(f"Schema validation error: {e}")
             return False
 
 
-    def validate_source_path(self, spec: dict) -> None:
-        # If source_type is localFileCSV or localFileJSON, ensure source_path exists
-        match spec.get("source_type"):
-            case "localFileCSV":
-                if not spec.get("source_path", "").endswith('.csv'):
-                    return False
-            case "localFileJSON":
-                if not spec.get("source_path", "").endswith('.jsonl'):
-                    return False
-            case _:
-                pass
-        return True
+    def validate_source_path(self, spec: dict) -> bool:
+        # File sources must point at a file with the matching extension
+        suffix = _SOURCE_SUFFIX.get(spec.get("source_type"))
+        return suffix is None or spec.get("source_path", "").endswith(suffix)
 
 
-    async def build_pipeline(self, user_input: str, fast: bool = False, mode: str = "chat", run_after_deploy: bool = False) -> PipelineBuildResponse:
+    async def build_pipeline(self, user_input: str, fast: bool = False, mode: str = "chat", run_after_deploy: bool = False, use_cache: bool = True) -> PipelineBuildResponse:
         """
         Build a pipeline using the new template-based approach.
         This is a more efficient alternative to the full build_pipeline method.
+        use_cache=False always asks the LLM for a fresh spec.
         """
+        # In cmd mode every step shares one spinner; otherwise steps run without any CLI output
+        spinner = StepSpinner() if mode == "cmd" else None
+        try:
+            return await self._build_pipeline(user_input, fast, run_after_deploy, use_cache, spinner)
+        finally:
+            if spinner is not None:
+                spinner.stop()
+
+    async def _build_pipeline(self, user_input: str, fast: bool, run_after_deploy: bool, use_cache: bool, spinner) -> PipelineBuildResponse:
+        runner = spinner.run if spinner is not None else self._run_step
+        step_timings_ms = {}
+
+        async def run(step_msg, step_number, coro, *args, **kwargs):
+            # Per-step wall time for this build, reported with the response
+            t0 = time.perf_counter_ns()
+            try:
+                return await runner(step_msg, step_number, coro, *args, **kwargs)
+            finally:
+                step_timings_ms[str(step_number)] = round((time.perf_counter_ns() - t0) / 1e6, 1)
+
+        # Also read by the failure response below, so bound before anything can raise
+        pipeline_name = pipeline_id = None
         try:
 
-            start_time = datetime.datetime.now()
+            start_time = time.perf_counter()
             # Step 1: Generate pipeline specification
             build_step = "generate_spec"
             step_msg = "Generating pipeline specification..."
             self.log.info(f"[STEP: {build_step}] {step_msg}")
             step_number = 1
-            spec, error = await self._run_step(step_msg, step_number, self.spec_gen.generate_spec, user_input, mode=mode)
+            spec, error = await run(step_msg, step_number, self.spec_gen.generate_spec, user_input, use_cache)
             if error:
                 self.log.error(f"Failed to generate pipeline specification: {error}")
                 return {"error": f"Failed to generate pipeline specification: {error}"}
+
+            pipeline_name = spec.get("pipeline_name")
+            schedule = spec.get("schedule")
             
+            # Steps 2 and 3 only read the spec, so validate it while connecting to the source
             # Step 2: Validate schema
             build_step = "validate_spec"
-            step_msg = "Validating pipeline specification schema..."
-            step_number = 2
-            self.log.info(f"[STEP: {build_step}] {step_msg}")
-         
-            isValidSpec, error = await self._run_step(step_msg, step_number, self.validate_spec_schema, spec, mode=mode)
-            if not isValidSpec or error:
-                self.log.error("Pipeline specification schema validation failed.")
-                return {"error": "Spec schema validation failed.", "spec": spec}
-            
+            validate_msg = "Validating pipeline specification schema..."
+            self.log.info(f"[STEP: {build_step}] {validate_msg}")
+
             # Step 3: Try connecting to source/destination
             build_step = "validate_source_connection"
-            step_msg = "Connecting to source/destination to validate access..."
-            step_number = 3
-            self.log.info(f"[STEP: {build_step}] {step_msg}")
-          
-            db_info, error  = await self._run_step(step_msg, step_number, self.source_service.fetch_data_from_source, spec, limit=5, mode=mode)
-            if error or not db_info.get("success"):
+            source_msg = "Connecting to source/destination to validate access..."
+            self.log.info(f"[STEP: {build_step}] {source_msg}")
+
+            (isValidSpec, validate_error), (db_info, source_error) = await self._run_steps(
+                run,
+                (validate_msg, 2, self.validate_spec_schema, (spec,), {}),
+                (source_msg, 3, self.source_service.fetch_data_from_source, (spec,), {"limit": 5}),
+                # One spinner can only show one step at a time
+                concurrent=spinner is None
+            )
+            if not isValidSpec or validate_error:
+                self.log.error("Pipeline specification schema validation failed.")
+                return {"error": "Spec schema validation failed.", "spec": spec}
+
+            if source_error or not db_info.get("success"):
                 self.log.error("Source/Destination connection failed.")
-                return {"error": "Source/Destination connection failed.", "details": db_info.get("details")}
+                return {"error": "Source/Destination connection failed.", "details": db_info.get("details") if db_info else str(source_error)}
             
             # Step 4: Generate pipeline code 
             build_step = "generate_code"
@@ -110,7 +139,7 @@ class PipelineBuilderService:
             self.log.info(f"[STEP: {build_step}] {step_msg}")
     
 
-            pipeline_code, error = await self._run_step(step_msg, step_number, self.code_gen.generate_code, spec, db_info, mode=mode)
+            pipeline_code, error = await run(step_msg, step_number, self.code_gen.generate_code, spec, db_info)
             if error:
                 self.log.error(f"Failed to generate pipeline code: {error}")
                 return {"error": f"Failed to generate pipeline code: {error}"}
@@ -124,10 +153,9 @@ class PipelineBuilderService:
             self.log.info(f"[STEP: {build_step}] {step_msg}")
     
             try:
-                pipeline_info, error = await self._run_step(step_msg, step_number, self.output_service.store_pipeline_files,
-                    spec.get("pipeline_name"), 
-                    pipeline_code, 
-                    mode=mode
+                pipeline_info, error = await run(step_msg, step_number, self.output_service.store_pipeline_files,
+                    pipeline_name, 
+                    pipeline_code
                 )
                 if error:
                     self.log.error(f"Failed to store pipeline files in MinIO: {error}")
@@ -146,9 +174,8 @@ class PipelineBuilderService:
                 step_number = 6
                 self.log.info(f"[STEP: {build_step}] {step_msg}")
                 try:
-                    test_result, error = await self._run_step(step_msg, step_number, self.test_service.run_pipeline_test_in_venv_v2,
-                        pipeline_id,  # Pass pipeline_id instead of folder path
-                        mode=mode
+                    test_result, error = await run(step_msg, step_number, self.test_service.run_pipeline_test_in_venv_v2,
+                        pipeline_id  # Pass pipeline_id instead of folder path
                     )
                     self.log.info(f"Test result: {test_result}")
                     if error or not test_result.get("success"):
@@ -163,73 +190,61 @@ class PipelineBuilderService:
 
                 if not test_result.get("success"):
                     self.log.error("Pipeline tests failed.")
-                    return {
-                        "pipeline_name": spec.get("pipeline_name"),
-                        "pipeline_id": pipeline_id,
-                        "success": False,
-                        "build_steps_completed": build_step,
-                        "error": "Pipeline tests failed.",
-                        "test_result": test_result
-                    }
+                    return self._make_failure_response(
+                        pipeline_name, pipeline_id, build_step, "Pipeline tests failed.",
+                        test_result=test_result
+                    )
             else:
-                if mode == "cmd":
-                    print("\033[93m[Step 6]: Run Pipeline Tests Fast mode enabled; skipping tests.\033[0m")
+                if spinner is not None:
+                    spinner.write("\033[93m[Step 6]: Run Pipeline Tests Fast mode enabled; skipping tests.\033[0m")
 
                 self.log.info("Fast mode enabled; skipping tests.")
 
                 test_result = {"skipped": True, "details": "Skipped tests in fast mode."}
 
+            # Steps 7 and 8 both only need the stored pipeline, so register it while the
+            # docker test runs. Errors are still reported in step order.
+            steps = []
             # Step 7: Register pipeline in the registry if tests passed
             if test_result.get("success") or test_result.get("skipped"):
                 build_step = "register_pipeline"
                 step_msg = "Registering pipeline in the registry..."
                 self.log.info(f"[STEP: {build_step}] {step_msg}")
-                step_number = 7
-                try:
-                    _, error = await self._run_step(step_msg, step_number, self.pipeline_registry.create_pipeline,
-                    pipeline_id=pipeline_id,
-                    name=spec.get("pipeline_name"),
-                    created_by=spec.get("created_by", "unknown"),
-                    description=spec.get("description", ""),
-                    spec=spec,
-                    mode=mode
-                    )
-                    if error:
-                        self.log.error(f"Failed to register pipeline: {error}")
-                        return {"success": False, "details": f"Failed to register pipeline: {error}"}
-                    
-                    self.log.info(f"Pipeline {pipeline_id} registered successfully.")
-                except Exception as e:
-                    self.log.error(f"Failed to register pipeline: {e}")
-                    return {"success": False, "details": f"Failed to register pipeline: {e}"}
+                steps.append((step_msg, 7, self.pipeline_registry.create_pipeline, (), {
+                    "pipeline_id": pipeline_id,
+                    "name": pipeline_name,
+                    "created_by": spec.get("created_by", "unknown"),
+                    "description": spec.get("description", ""),
+                    "spec": spec,
+                }))
                 
             # TODO: Step 7: Iterate to perfect the pipeline based on test results (if needed)
 
             # Step 8: Test code in docker container - test runner
             build_step = "Test_pipeline_in_docker"
             step_msg = "Testing the pipeline in Docker container..."
-            step_number = 8
             self.log.info(f"[STEP: {build_step}] {step_msg}")
-     
-            try:
-                test_runner_result, error = await self._run_step(step_msg, step_number, self.dockerize_service.test_pipeline_in_docker, pipeline_id, mode=mode)
-                self.log.info(f"Test runner result:\n{json.dumps(test_runner_result, indent=2)}")
-                if error:
-                    self.log.error(f"Test runner failed: {error}")
-                    return {"success": False, "details": f"Failed to test the pipeline in Docker container: {error}"}
-            except Exception as e:
-                self.log.error(f"Failed to test the pipeline in Docker container: {e}")
-                return {"success": False, "details": f"Failed to test the pipeline in Docker container: {e}"}
+            steps.append((step_msg, 8, self.dockerize_service.test_pipeline_in_docker, (pipeline_id,), {}))
+
+            *register_result, (test_runner_result, error) = await self._run_steps(run, *steps, concurrent=spinner is None)
+            if register_result:
+                _, register_error = register_result[0]
+                if register_error:
+                    self.log.error(f"Failed to register pipeline: {register_error}")
+                    return {"success": False, "details": f"Failed to register pipeline: {register_error}"}
+                self.log.info(f"Pipeline {pipeline_id} registered successfully.")
+
+            if self.log.isEnabledFor(logging.INFO):
+                self.log.info("Test runner result:\n%s", safe_json_dumps(test_runner_result, indent=True))
+            if error:
+                self.log.error(f"Test runner failed: {error}")
+                return {"success": False, "details": f"Failed to test the pipeline in Docker container: {error}"}
             if not test_runner_result.get("success"):
                 self.log.error("Dockerization failed.")
-                return {
-                    "pipeline_name": spec.get("pipeline_name"),
-                    "build_steps_completed": build_step,
-                    "pipeline_id": pipeline_id,
-                    "success": False,
-                    "error": "Docker test in test runner failed.",
-                    "test_runner_result": test_runner_result
-                }
+                return self._make_failure_response(
+                    pipeline_name, pipeline_id, build_step, "Docker test in test runner failed.",
+                    test_runner_result=test_runner_result
+                )
             
             # Step 9: Dockerizeition 
             build_step = "Dockerizeition"
@@ -237,11 +252,11 @@ class PipelineBuilderService:
             step_number = 9
             self.log.info(f"[STEP: {build_step}] {step_msg}")
             try:
-                dockerize_result, error = await self._run_step(step_msg, step_number, self.dockerize_service.dockerize_pipeline_v2,
-                    pipeline_id,
-                    mode=mode
+                dockerize_result, error = await run(step_msg, step_number, self.dockerize_service.dockerize_pipeline_v2,
+                    pipeline_id
                 )
-                self.log.info(f"Dockerizeition result:\n{json.dumps(dockerize_result, indent=2)}")
+                if self.log.isEnabledFor(logging.INFO):
+                    self.log.info("Dockerizeition result:\n%s", safe_json_dumps(dockerize_result, indent=True))
                 if error:
                     self.log.error(f"Dockerizeition failed: {error}")
                     return {"success": False, "details": f"Failed to Dockerize the pipeline: {error}"}
@@ -255,11 +270,10 @@ class PipelineBuilderService:
             step_number = 10
             self.log.info(f"[STEP: {build_step}] {step_msg}")
 
-            if spec.get("schedule") and spec.get("schedule") != "manual":
-                scheduled_result, error = await self._run_step(step_msg, step_number, self.scheduler_service.save_pipeline_to_catalog,
+            if schedule and schedule != "manual":
+                scheduled_result, error = await run(step_msg, step_number, self.scheduler_service.save_pipeline_to_catalog,
                     pipeline_id,
-                    spec,
-                    mode=mode
+                    spec
                 )
                 if error:
                     self.log.error(f"Failed to schedule the pipeline: {error}")
@@ -280,65 +294,104 @@ class PipelineBuilderService:
                 step_number = 11
                 # Run the pipeline once after deployment
                 self.log.info("Running the pipeline once after deployment...")
-                run_result, error = await self._run_step( step_msg, step_number,
-                    self.dockerize_service.run_pipeline_in_container, dockerize_result.get("image_id"),
-                    mode=mode
+                run_result, error = await run( step_msg, step_number,
+                    self.dockerize_service.run_pipeline_in_container, dockerize_result.get("image_id")
                     )
                 if error:
                     self.log.error(f"Failed to run the pipeline after deployment: {error}")
-                else:
-                    self.log.info(f"Pipeline run result after deployment:\n{json.dumps(run_result, indent=2)}")
+                elif self.log.isEnabledFor(logging.INFO):
+                    self.log.info("Pipeline run result after deployment:\n%s", safe_json_dumps(run_result, indent=True))
 
-            execution_time = (datetime.datetime.now() - start_time).seconds
-            message = f"Pipeline created successfully in {execution_time} seconds"
+            # Monotonic and sub-second; timedelta.seconds dropped the fraction and wrapped at a day
+            execution_time = round(time.perf_counter() - start_time, 2)
+            message = f"Pipeline created successfully in {execution_time:.2f} seconds"
             
             self.log.info(message)
-            if mode == "cmd":
+            self.log.info("Step timings (ms): %s", step_timings_ms)
+            if spinner is not None:
+                spinner.stop()
                 print(f"\n\033[94mDone! {message}\033[0m")
 
-            response = {
-                "pipeline_name": spec.get("pipeline_name"),
-                "pipeline_id": pipeline_id, 
-                "container_id": dockerize_result.get("container_id"),
-                "dockerize_result": dockerize_result,
-                "build_steps_completed": build_step,
-                "success": True,
-                "request_spec": spec,
-                "test_result": test_result,
-                "message": message,
-                "test_runner_result": test_runner_result ,
-                "scheduling_result": scheduled_result,
-                "execution_time": execution_time
-            }
+            response = self._make_success_response(
+                pipeline_name, pipeline_id, build_step, message,
+                container_id=dockerize_result.get("container_id"),
+                dockerize_result=dockerize_result,
+                request_spec=spec,
+                test_result=test_result,
+                test_runner_result=test_runner_result,
+                scheduling_result=scheduled_result,
+                execution_time=execution_time,
+                step_timings_ms=step_timings_ms
+            )
 
             if run_after_deploy:
                 response["run_result_after_deploy"] = run_result
 
-            self.log.info("Pipeline build response:\n%s", json.dumps(response, indent=2))
+            # Only specs that made it through a whole build are reused for the same request
+            if use_cache:
+                await self.spec_gen.remember_spec(user_input, spec)
+
+            # Only pretty-print the (large) response when INFO records are actually emitted
+            if self.log.isEnabledFor(logging.INFO):
+                self.log.info("Pipeline build response:\n%s", safe_json_dumps(response, indent=True))
             
             return response
             
         except Exception as e:
             self.log.error(f"Failed to create pipeline: {e}")
-            return {
-                "success": False,
-                "pipeline_name": spec.get("pipeline_name"),
-                "pipeline_id": pipeline_id if 'pipeline_id' in locals() else None,
-                "build_steps_completed": build_step,
-                "error": str(e),
-                "message": f"Failed to create pipeline: {e}"
-            }
-
-    async def _run_step(self, step_msg: str, step_number: int, coro, *args, mode="chat", **kwargs):
+            return self._make_failure_response(
+                pipeline_name, pipeline_id, build_step, str(e),
+                message=f"Failed to create pipeline: {e}"
+            )
+
+    @staticmethod
+    def _make_success_response(pipeline_name, pipeline_id, build_step, message, **results) -> PipelineBuildResponse:
+        """Response for a finished build; results are the per-step outputs and timings."""
+        return {
+            "pipeline_name": pipeline_name,
+            "pipeline_id": pipeline_id,
+            "build_steps_completed": build_step,
+            "success": True,
+            "message": message,
+            **results,
+        }
+
+    @staticmethod
+    def _make_failure_response(pipeline_name, pipeline_id, build_step, error, **details) -> PipelineBuildResponse:
+        """Response for a build that stopped at build_step; details adds the failing step's output."""
+        return {
+            "pipeline_name": pipeline_name,
+            "pipeline_id": pipeline_id,
+            "build_steps_completed": build_step,
+            "success": False,
+            "error": error,
+            **details,
+        }
+
+    async def _run_steps(self, run, *steps, concurrent=True):
+        """
+        Run independent steps with run (a step runner). Each step is (step_msg, step_number, coro, args, kwargs).
+        Returns a list of (result, error) in the order the steps were given.
+        With concurrent=False they run one after another, e.g. when they share one CLI spinner.
         """
-        Helper to run an async step with optional CLI spinner.
+        if not concurrent:
+            return [
+                await run(msg, number, coro, *args, **kwargs)
+                for msg, number, coro, args, kwargs in steps
+            ]
+        return await asyncio.gather(*(
+            run(msg, number, coro, *args, **kwargs)
+            for msg, number, coro, args, kwargs in steps
+        ))
+
+    @staticmethod
+    async def _run_step(step_msg: str, step_number: int, coro, *args, **kwargs):
+        """
+        Run an async step without CLI output.
         Returns (result, error). If error is not None, result is None.
         """
-        if mode == "cmd":
-            return await run_step_with_spinner(step_msg, step_number, coro, *args, **kwargs)
-        else:
-            try:
-                result = await coro(*args, **kwargs)
-                return result, None
-            except Exception as e:
-                return None, e
+        try:
+            result = await coro(*args, **kwargs)
+            return result, None
+        except Exception as e:
+            return None, e
@@ -1,9 +1,14 @@
 import os
 import glob
+import fnmatch
+import orjson
 import pandas as pd
 import time
 import asyncio
 
+# Rows read per chunk when only the first rows of a file are needed
+PREVIEW_CHUNK_ROWS = 1000
+
 class LocalFileService:
     def __init__(self,log, data_directory=None):
         """Initialize with environment-aware data directory"""
@@ -24,6 +29,8 @@ class LocalFileService:
         else:
             self.data_directory = data_directory
             print(f"Using custom data directory: {self.data_directory}")
+        # pattern -> (directory mtime, matching files newest first)
+        self._listing_cache = {}
     
     def _resolve_pattern(self, file_pattern):
         """Resolve file pattern to work with the configured data directory"""
@@ -71,11 +78,11 @@ class LocalFileService:
             limit
         )
     
-    def _retrieve_recent_data_files_sync(self, file_pattern, date_column=None, date_value=None, limit=None):
-        """Synchronous version for thread pool execution."""
+    def _recent_files(self, file_pattern):
+        """Files matching the pattern, newest first. Raises FileNotFoundError if there are none."""
         try:
             full_pattern = self._resolve_pattern(file_pattern)
-            files = glob.glob(full_pattern)
+            files = self._list_files(full_pattern)
             now = time.time()
             last_24_hours = now - 24 * 60 * 60
             # recent_files = [f for f in files if os.path.getmtime(f) >= last_24_hours]
@@ -87,27 +94,107 @@ class LocalFileService:
 
         # temp - all files
         # TODO - restore last_24_hours filter
-        recent_files = files
+        return files
+
+    def _retrieve_recent_data_files_sync(self, file_pattern, date_column=None, date_value=None, limit=None):
+        """Synchronous version for thread pool execution."""
+        recent_files = self._recent_files(file_pattern)
+        # limit caps the number of rows returned, so stop reading once enough rows are collected
+        chunksize = max(limit, PREVIEW_CHUNK_ROWS) if limit is not None else None
         data_frames = []
+        remaining = limit
         for file in recent_files:
-            if file.endswith('.csv'):
-                df = pd.read_csv(file)
-            elif file.endswith('.json'):
-                df = pd.read_json(file)
-            elif file.endswith('.jsonl'):
-                df = pd.read_json(file, lines=True)
-            else:
-                continue
-            if date_column and date_value and date_column in df.columns:
-                df = df[df[date_column] == date_value]
-            data_frames.append(df)
+            for df in self._iter_data_file(file, chunksize):
+                if date_column and date_value and date_column in df.columns:
+                    df = df[df[date_column] == date_value]
+                if remaining is not None:
+                    df = df.head(remaining)
+                    remaining -= len(df)
+                data_frames.append(df)
+                if remaining == 0:
+                    break
+            if remaining == 0:
+                break
         if data_frames:
-            if limit is not None:
-                data_frames = data_frames[:limit]
             return pd.concat(data_frames, ignore_index=True)
         else:
             raise FileNotFoundError(f"No files found in last 24 hours for pattern: {file_pattern}")
 
+    async def retrieve_recent_jsonl_records(self, file_pattern, date_column=None, date_value=None, limit=None):
+        """
+        Asynchronously read up to limit records from the JSONL files matching the pattern.
+        Lines are parsed one at a time with orjson, so only the lines needed are read and no DataFrame is built.
+        """
+        return await asyncio.to_thread(
+            self._retrieve_recent_jsonl_records_sync,
+            file_pattern,
+            date_column,
+            date_value,
+            limit
+        )
+
+    def _retrieve_recent_jsonl_records_sync(self, file_pattern, date_column=None, date_value=None, limit=None):
+        """Synchronous version for thread pool execution."""
+        jsonl_files = [f for f in self._recent_files(file_pattern) if f.endswith('.jsonl')]
+        if not jsonl_files:
+            raise FileNotFoundError(f"No JSONL files found for pattern: {file_pattern}")
+        records = []
+        for file in jsonl_files:
+            with open(file, 'rb') as f:
+                for line in f:
+                    if limit is not None and len(records) >= limit:
+                        return records
+                    if not line.strip():
+                        continue
+                    record = orjson.loads(line)
+                    if date_column and date_value and record.get(date_column, date_value) != date_value:
+                        continue
+                    records.append(record)
+        return records
+
+    def _list_files(self, full_pattern):
+        """
+        Files matching full_pattern, newest first. The listing is cached until the directory's
+        mtime changes (a file added, removed or renamed), so repeat probes skip the directory scan.
+        """
+        directory, name_pattern = os.path.split(full_pattern)
+        if glob.has_magic(directory):
+            # Wildcards in the directory part: no single directory to watch
+            return glob.glob(full_pattern)
+        dir_mtime = os.stat(directory or ".").st_mtime_ns
+        cached = self._listing_cache.get(full_pattern)
+        if cached and cached[0] == dir_mtime:
+            return cached[1]
+        matches = []
+        with os.scandir(directory or ".") as entries:
+            for entry in entries:
+                # Like glob, wildcards don't match hidden files
+                if entry.name.startswith('.') and not name_pattern.startswith('.'):
+                    continue
+                if fnmatch.fnmatch(entry.name, name_pattern) and entry.is_file():
+                    matches.append((entry.stat().st_mtime, entry.path))
+        files = [path for _, path in sorted(matches, reverse=True)]
+        self._listing_cache[full_pattern] = (dir_mtime, files)
+        return files
+
+    def _iter_data_file(self, file, chunksize=None):
+        """Yield a data file's rows as DataFrames, chunksize rows at a time when given."""
+        if file.endswith('.csv'):
+            read, kwargs = pd.read_csv, {}
+        elif file.endswith('.json'):
+            # A JSON document can't be read partially
+            yield pd.read_json(file)
+            return
+        elif file.endswith('.jsonl'):
+            read, kwargs = pd.read_json, {"lines": True}
+        else:
+            return
+        if chunksize is None:
+            yield read(file, **kwargs)
+            return
+        with read(file, chunksize=chunksize, **kwargs) as reader:
+            yield from reader
+
     async def check_file_exists(self, file_path):
         """
         Asynchronously check if a file exists at the given path.
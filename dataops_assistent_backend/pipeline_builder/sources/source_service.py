@@ -1,13 +1,34 @@
+import time
+import hashlib
 
+import orjson
 
-from os import sync
-import pandas as pd
-
-from shared.utils.json_utils import make_json_serializable
+from shared.utils.json_utils import to_json_bytes
 
 from shared.services.database_service import get_database_service
 from .local_file_service import LocalFileService
 
+
+def _fold_ident(name: str) -> str:
+    """
+    Resolve an identifier from a spec the way PostgreSQL would: unquoted names fold to
+    lowercase, names already in double quotes keep their case.
+    """
+    name = name.strip()
+    if len(name) >= 2 and name[0] == name[-1] == '"':
+        return name[1:-1].replace('""', '"')
+    return name.lower()
+
+
+def _quote_ident(name: str) -> str:
+    """Quote a resolved PostgreSQL identifier so it can be interpolated into SQL safely."""
+    return '"' + name.replace('"', '""') + '"'
+
+# Source previews are reused for this long, so rebuilding against an unchanged source skips the probe
+PREVIEW_CACHE_TTL_SECONDS = 60
+PREVIEW_CACHE_MAX_ENTRIES = 128
+
+
 class SourceService:
 
     def __init__(self, log):
@@ -15,83 +36,119 @@ class SourceService:
         self.log = log
         self.local_file_service = LocalFileService(self.log)
         self.database_service = get_database_service()
+        self._preview_cache: dict[str, tuple[float, dict]] = {}
+        # source_type -> preview handler(spec, limit); unlisted types need no probe
+        self._source_handlers = {
+            "PostgreSQL": self._fetch_postgres,
+            "localFileCSV": self._fetch_csv,
+            "localFileJSON": self._fetch_jsonl,
+        }
+
+    async def fetch_data_from_source(self, spec: dict, limit: int = 5, refresh: bool = False) -> dict:
+        # Try connecting to source/destination based on spec.
+        # limit is the number of sample rows; 0 only verifies access and returns the schema.
+        # Successful results are cached briefly per source; refresh=True forces a new probe.
+        key = hashlib.blake2b(
+            f"{spec.get('source_type')}|{spec.get('source_table', '')}|{spec.get('source_path', '')}|{limit}".encode(),
+            digest_size=16,
+        ).hexdigest()
+        now = time.monotonic()
+        cached = self._preview_cache.get(key)
+        if cached and not refresh and now - cached[0] < PREVIEW_CACHE_TTL_SECONDS:
+            return cached[1]
+
+        result = await self._fetch_data_from_source(spec, limit)
+        if result.get("success"):
+            self._preview_cache.pop(key, None)
+            if len(self._preview_cache) >= PREVIEW_CACHE_MAX_ENTRIES:
+                # Oldest entry first (dicts keep insertion order)
+                self._preview_cache.pop(next(iter(self._preview_cache)))
+            self._preview_cache[key] = (now, result)
+        return result
+
+    async def _fetch_data_from_source(self, spec: dict, limit: int) -> dict:
+        handler = self._source_handlers.get(spec.get("source_type"))
+        if handler is None:
+            # Nothing to probe for this source type (sqlLite, api)
+            return {"success": True}
+        return await handler(spec, limit)
+
+    async def _fetch_postgres(self, spec: dict, limit: int) -> dict:
+        source_table = spec.get('source_table')
+        self.log.info(f"source_table from spec: {source_table}")
+        if not source_table:
+            return {"success": False, "error": "source_table is required for PostgreSQL source"}
+
+        # Handle table name format (with or without schema)
+        if '.' not in source_table:
+            # If no schema specified, assume public schema
+            table_name = f"public.{source_table}"
+        else:
+            table_name = source_table
+
+        self.log.info(f"Fetching data from table: {table_name}")
+        schema_name, table_only = (_fold_ident(part) for part in table_name.split('.', 1))
+        # The table name can't be a bind parameter, so quote it instead of pasting the spec value in.
+        # Names are case-folded first, so quoting doesn't make mixed-case spec names case-sensitive
+        quoted_table = f"{_quote_ident(schema_name)}.{_quote_ident(table_only)}"
+        # One round trip: column metadata and sample rows are aggregated to JSON server-side
+        preview_query = f"""
+            SELECT json_build_object(
+                'columns', (
+                    SELECT json_agg(json_build_object('name', column_name, 'type', data_type) ORDER BY ordinal_position)
+                    FROM information_schema.columns
+                    WHERE table_name = :table_name AND table_schema = :schema_name
+                ),
+                'rows', (SELECT json_agg(t) FROM (SELECT * FROM {quoted_table} LIMIT :limit) t)
+            )
+        """
+        try:
+            result = await self.database_service.fetch_value(
+                preview_query,
+                {"table_name": table_only, "schema_name": schema_name, "limit": limit},
+            )
+            # asyncpg hands back json as text, psycopg2 decodes it already
+            if isinstance(result, (str, bytes)):
+                result = orjson.loads(result)
+            result = result or {}
+            columns = result.get("columns")
+
+            if limit == 0:
+                # Schema-only probe: no sample rows needed
+                return {"success": True, "columns": columns}
+
+            data_preview = result.get("rows") or []
+            if data_preview:
+                self.log.debug(f"PostgreSQL data preview: {data_preview}")
+            else:
+                self.log.warning(f"No data found in table {table_name}")
+        except Exception as e:
+            self.log.error(f"Error fetching data from {table_name}: {e}")
+            return {"success": False, "details": f"Error fetching data from table {table_name}: {e}"}
+
+        return {"success": True, "data_preview": data_preview, "columns": columns}
+
+    async def _fetch_csv(self, spec: dict, limit: int) -> dict:
+        try:
+            data = await self.local_file_service.retrieve_recent_data_files(spec.get("source_path"), date_column="event_date", date_value="2025-09-18", limit=limit)
+            if data is not None:
+                # Already capped at limit rows by the file service
+                raw_preview = data.to_dict(orient="records")
+                # Make JSON serializable (encoded and decoded by orjson in C)
+                data_preview = orjson.loads(to_json_bytes(raw_preview))
+                return {"success": True, "data_preview": data_preview}
+            else:
+                return {"success": False, "details": "No recent data files found."}
+        except Exception as e:
+            return {"success": False, "details": "Failed to connect to local CSV source."}
 
-    async def fetch_data_from_source(self, spec: dict, limit: int) -> dict:
-        # Try connecting to source/destination based on spec
-        match spec.get("source_type"):
-            case "PostgreSQL":
-                data_preview = []
-                source_table = spec.get('source_table')
-                self.log.info(f"source_table from spec: {source_table}")
-                if not source_table:
-                    return {"success": False, "error": "source_table is required for PostgreSQL source"}
-                
-                # Handle table name format (with or without schema)
-                if '.' not in source_table:
-                    # If no schema specified, assume public schema
-                    table_name = f"public.{source_table}"
-                else:
-                    table_name = source_table
-                
-                self.log.info(f"Fetching data from table: {table_name}")
-                try:
-                    # Fetch a small sample of data for preview
-                    data = await self.database_service.fetch_all(f"SELECT * FROM {table_name} LIMIT {limit}")
-                   
-                    # Convert to Json serializable format
-                    if data is not None and len(data) > 0:
-                        # Get column names
-                        table_only = source_table.split('.')[-1]  # Extract table name without schema
-                        schema_name = table_name.split('.')[0] if '.' in table_name else 'public'
-                        columns_query = f"SELECT column_name, data_type FROM information_schema.columns WHERE table_name = '{table_only}' AND table_schema = '{schema_name}' ORDER BY ordinal_position"
-                        column_results = await self.database_service.fetch_all(columns_query)
-                        columns = [{"name": row[0], "type": row[1]} for row in column_results] if column_results else None
-                        
-                        columns_names = [col['name'] for col in columns] if columns else None
-                        # Convert to DataFrame for easier handling
-                        df = pd.DataFrame(data, columns=columns_names if columns_names else None)
-                        raw_preview = df.head().to_dict(orient="records")
-                        # Make JSON serializable
-                        data_preview = make_json_serializable(raw_preview)
-                        self.log.debug(f"PostgreSQL data preview: {data_preview}")
-                    else:
-                        self.log.warning(f"No data found in table {table_name}")
-                except Exception as e:
-                    self.log.error(f"Error fetching data from {table_name}: {e}")
-                    return {"success": False, "details": f"Error fetching data from table {table_name}: {e}"}
-                
-                return {"success": True, "data_preview": data_preview, "columns": columns}
-
-            case "localFileCSV":
-                try:
-                    data = await self.local_file_service.retrieve_recent_data_files(spec.get("source_path"), date_column="event_date", date_value="2025-09-18", limit=limit)
-                    if data is not None:
-                        raw_preview = data.head().to_dict(orient="records")
-                        # Make JSON serializable
-                        data_preview = make_json_serializable(raw_preview)
-                        return {"success": True, "data_preview": data_preview}
-                    else:
-                        return {"success": False, "details": "No recent data files found."}
-                except Exception as e:
-                    return {"failed": False, "details": "Failed to connect to local CSV source."}
-            case "localFileJSON":
-                try:
-                    data = await self.local_file_service.retrieve_recent_data_files(spec.get("source_path"), date_column="event_date", date_value="2025-09-18", limit=limit)
-                    if data is not None:
-                        raw_preview = data.head().to_dict(orient="records")
-                        # Make JSON serializable
-                        data_preview = make_json_serializable(raw_preview)
-                        return {"success": True, "data_preview": data_preview}
-                    else:
-                        return {"success": False, "details": "No recent data files found."}
-                except Exception as e:
-                    return {"failed": False, "details": "Failed to connect to local JSON source."}
-            case "sqlLite":
-                pass
-            case "api":
-                pass
-
-        return {"success": True}
+    async def _fetch_jsonl(self, spec: dict, limit: int) -> dict:
+        try:
+            # Records come straight from orjson, so they are JSON-ready without a DataFrame round trip
+            data_preview = await self.local_file_service.retrieve_recent_jsonl_records(spec.get("source_path"), date_column="event_date", date_value="2025-09-18", limit=limit)
+            return {"success": True, "data_preview": data_preview}
+        except Exception as e:
+            return {"success": False, "details": "Failed to connect to local JSON source."}
     
 
     
\ No newline at end of file
@@ -0,0 +1,186 @@
+import os
+import re
+import asyncio
+import tempfile
+import xml.etree.ElementTree as ET
+from shared.utils import proc
+
+# Requests already queued together that share a venv run in one pytest process, up to this many
+MAX_BATCH = int(os.getenv("PIPELINE_TEST_MAX_BATCH", "8"))
+
+# Holds the pipeline_batch pytest plugin; added to PYTHONPATH of pytest runs
+PLUGIN_DIR = os.path.join(os.path.dirname(__file__), "pytest_plugins")
+
+# Cheaper collection for short generated tests: no .pytest_cache writes, no assertion
+# rewriting, quiet output
+PYTEST_FAST_ARGS = ("-p", "no:cacheprovider", "-q", "--assert=plain", "--disable-warnings")
+
+# Single-pass scan of captured pipeline output for error keywords
+_ERR_RE = re.compile(r"error|exception|traceback|fail", re.IGNORECASE)
+
+
+class TestBatcher:
+    """
+    Runs pipeline tests with pytest, coalescing runs that share a venv into a single process.
+    Callers submit (venv_dir, test_file) and get back the result for their own file.
+    Results come from a JUnit report that includes each test's captured output and logs, which
+    is also scanned for error keywords, so the pipeline does not need a separate run.
+    """
+
+    # Not a test class, despite the name
+    __test__ = False
+
+    def __init__(self, log):
+        self.log = log
+        self._queue = None
+        self._worker = None
+        self._groups = set()
+
+    async def submit(self, venv_dir: str, test_file: str) -> dict:
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((venv_dir, test_file, future))
+        return await future
+
+    def _ensure_worker(self):
+        # The queue and worker belong to one event loop; scripts using asyncio.run get a new loop per call
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._work())
+
+    async def _work(self):
+        while True:
+            # Take whatever is already waiting and flush as soon as the queue is empty;
+            # a lone request never waits for company
+            batch = [await self._queue.get()]
+            while len(batch) < MAX_BATCH and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            groups = {}
+            for item in batch:
+                groups.setdefault(item[0], []).append(item)
+            for venv_dir, items in groups.items():
+                task = asyncio.create_task(self._run_group(venv_dir, items))
+                self._groups.add(task)
+                task.add_done_callback(self._groups.discard)
+
+    async def _run_group(self, venv_dir: str, items: list):
+        test_files = [test_file for _, test_file, _ in items]
+        try:
+            try:
+                results = await self._run_pytest(venv_dir, test_files)
+            except Exception as e:
+                if len(test_files) == 1:
+                    raise
+                self.log.error(f"Batched pytest run failed: {e}")
+                results = {}
+            # Files whose outcome can't be read from a shared report, or all of them after an
+            # abnormal batch run, are re-run on their own
+            retry = [f for f in test_files if results.get(f) is None]
+            if retry and len(test_files) > 1:
+                self.log.info(f"Re-running {len(retry)} test files individually")
+                singles = await asyncio.gather(*(self._run_pytest(venv_dir, [f]) for f in retry))
+                for single in singles:
+                    results.update(single)
+        except Exception as e:
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for _, test_file, future in items:
+            if not future.done():
+                future.set_result(results[test_file])
+
+    async def _run_pytest(self, venv_dir: str, test_files: list) -> dict:
+        """
+        Run test_files in one pytest process and split the JUnit report per file.
+        A single file without a readable report falls back to pytest's exit code and output.
+        """
+        rootdir = os.path.commonpath([os.path.dirname(f) for f in test_files])
+        pythonpath = os.pathsep.join(p for p in (PLUGIN_DIR, os.environ.get("PYTHONPATH")) if p)
+        if len(test_files) > 1:
+            self.log.info(f"Running {len(test_files)} pipeline test files in one pytest process")
+
+        with tempfile.TemporaryDirectory() as report_dir:
+            report = os.path.join(report_dir, "report.xml")
+            argv = [
+                os.path.join(venv_dir, 'bin', 'pytest'), *test_files,
+                f"--rootdir={rootdir}", "--no-header", "--import-mode=importlib",
+                "-p", "pipeline_batch", f"--junit-xml={report}",
+                "-o", "junit_family=xunit1", "-o", "junit_logging=all",
+                *PYTEST_FAST_ARGS,
+            ]
+            # Stopping at the first failure would leave the rest of a batch unreported
+            if len(test_files) == 1:
+                argv.append("-x")
+            env = {**os.environ, "PYTHONPATH": pythonpath, "PYTHONDONTWRITEBYTECODE": "1"}
+            returncode, stdout, stderr = await proc.run(argv, env=env, log=self.log)
+            # No report (pytest died early) or a truncated one falls back to the exit code
+            try:
+                results = self._parse_report(report, rootdir, test_files)
+            except (FileNotFoundError, ET.ParseError):
+                results = {}
+
+        # Exit codes other than "passed"/"tests failed" (interrupted, internal error, usage error,
+        # killed) mean one pipeline may have broken the shared process; don't trust a batch report
+        if len(test_files) > 1 and returncode not in (0, 1):
+            self.log.error(f"Batched pytest run exited abnormally ({returncode})")
+            return {}
+
+        if len(test_files) == 1 and results.get(test_files[0]) is None:
+            output = f"{stdout.decode(errors='replace')}\n{stderr.decode(errors='replace')}"
+            if returncode != 0:
+                self.log.error(f"Tests failed:\n{output}")
+                results[test_files[0]] = {"success": False, "details": f"Tests failed:\n{output}"}
+            else:
+                results[test_files[0]] = {"success": True, "details": "Pipeline executed successfully"}
+        return results
+
+    def _parse_report(self, report: str, rootdir: str, test_files: list) -> dict:
+        """
+        Map a JUnit (xunit1) report back to per-file results.
+        Returns {} when a failure can't be attributed to a file; files without test cases are left out.
+        """
+        folders = {os.path.relpath(os.path.dirname(f), rootdir).replace(os.sep, "/"): f for f in test_files}
+        cases = {test_file: [] for test_file in test_files}
+
+        for case in ET.parse(report).iter("testcase"):
+            path = case.get("file") or case.get("classname", "").replace(".", "/")
+            if folders.keys() == {"."}:
+                test_file = test_files[0]
+            else:
+                test_file = next((f for folder, f in folders.items() if path.startswith(folder + "/")), None)
+            problems = [child for child in case if child.tag in ("failure", "error")]
+            if test_file is None:
+                if problems:
+                    return {}
+                continue
+            captured = [child.text for child in case if child.tag in ("system-out", "system-err") and child.text]
+            cases[test_file].append((case.get("name"), problems, captured))
+
+        results = {}
+        for test_file, file_cases in cases.items():
+            if not file_cases:
+                continue
+            failures = [
+                f"{name}: {problem.get('message', '')}\n{problem.text or ''}"
+                for name, problems, _ in file_cases for problem in problems
+            ]
+            captured = [text for _, _, texts in file_cases for text in texts]
+            if failures:
+                self.log.error(f"Tests failed for {test_file}:\n" + "\n".join(failures))
+                results[test_file] = {"success": False, "details": "Tests failed:\n" + "\n".join(failures)}
+            elif any(_ERR_RE.search(text) for text in captured):
+                # Only build the readable output on the error branch; drop pytest's
+                # "--- Captured Log/Out/Err ---" headers and blank lines
+                output = "\n".join(
+                    line for text in captured for line in text.splitlines()
+                    if line.strip() and not line.startswith("---")
+                )
+                self.log.error(f"Pipeline execution completed but errors detected in output:\n{output}")
+                results[test_file] = {"success": False, "details": f"Pipeline execution completed but errors detected in output:\n{output}"}
+            else:
+                self.log.info(f"All tests passed for {test_file}")
+                results[test_file] = {"success": True, "details": "Pipeline executed successfully"}
+        return results
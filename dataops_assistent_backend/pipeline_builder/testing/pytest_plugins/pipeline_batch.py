@@ -0,0 +1,68 @@
+"""
+pytest plugin used when several pipeline test files run in one pytest process.
+Every staged pipeline has its own pipeline.py, so each test module is imported with its own
+pipeline's folder first on sys.path and its own `pipeline` module in sys.modules. The same
+state is restored around every test, together with the working directory and os.environ, so a
+test that imports `pipeline` lazily or changes the environment does not see or leak into another
+pipeline's.
+Loaded with `-p pipeline_batch`; only uses the standard library and pytest.
+"""
+import os
+import sys
+
+import pytest
+
+_PIPELINE_MODULES = ("pipeline",)
+
+# Pipeline modules imported while collecting each folder's test module
+_folder_modules = {}
+
+
+def _enter_folder(folder, modules):
+    for name in _PIPELINE_MODULES:
+        if name in modules:
+            sys.modules[name] = modules[name]
+        else:
+            sys.modules.pop(name, None)
+    while folder in sys.path:
+        sys.path.remove(folder)
+    sys.path.insert(0, folder)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_make_collect_report(collector):
+    if not isinstance(collector, pytest.Module):
+        yield
+        return
+    folder = str(collector.path.parent)
+    saved_path, saved_cwd = list(sys.path), os.getcwd()
+    _enter_folder(folder, {})
+    os.chdir(folder)
+    try:
+        yield
+    finally:
+        _folder_modules[folder] = {
+            name: sys.modules.pop(name) for name in _PIPELINE_MODULES if name in sys.modules
+        }
+        sys.path[:] = saved_path
+        os.chdir(saved_cwd)
+
+
+@pytest.fixture(autouse=True)
+def _pipeline_isolation(request, monkeypatch):
+    folder = str(request.path.parent)
+    saved_path, saved_env = list(sys.path), dict(os.environ)
+    saved_modules = {name: sys.modules.get(name) for name in _PIPELINE_MODULES}
+    _enter_folder(folder, _folder_modules.get(folder, {}))
+    monkeypatch.chdir(folder)
+    try:
+        yield
+    finally:
+        sys.path[:] = saved_path
+        os.environ.clear()
+        os.environ.update(saved_env)
+        for name, module in saved_modules.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
@@ -15,6 +15,7 @@ logging.basicConfig(
 async def main():
     fast = False
     run_after_deploy = False
+    use_cache = True
     args = sys.argv[1:]
     if '--fast' in args:
         fast = True
@@ -22,8 +23,11 @@ async def main():
     if '--run-after-deploy' in args:
         run_after_deploy = True
         args.remove('--run-after-deploy')
+    if '--no-cache' in args:
+        use_cache = False
+        args.remove('--no-cache')
     if len(args) < 1:
-        print("Usage: python generate_pipeline.py 'your message here' [--fast] [--run-after-deploy] [--cmd]")
+        print("Usage: python generate_pipeline.py 'your message here' [--fast] [--run-after-deploy] [--no-cache] [--cmd]")
         return
     message = args[0]
     chat_service = ChatService()
@@ -34,7 +38,7 @@ async def main():
 ──────────────────────────────────────────────────────────────
           """)
     
-    pipeline_result = await chat_service.process_message(message, fast=fast, mode="cmd", run_after_deploy=run_after_deploy)
+    pipeline_result = await chat_service.process_message(message, fast=fast, mode="cmd", run_after_deploy=run_after_deploy, use_cache=use_cache)
     pretty_print_pipeline_result(pipeline_result)
     
 
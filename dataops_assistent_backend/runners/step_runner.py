@@ -4,18 +4,27 @@ import sys
 
 import asyncio
 import inspect
-import importlib.util
+import importlib
+import pkgutil
 import os
 
+STEPS_DIR = os.path.join(os.path.dirname(__file__), "steps")
+
+# Step number -> module name, listed once. Modules are imported on first use and then reused from
+# sys.modules, so only the steps actually run pay for their top-level setup.
+_STEP_MODULES = {
+    name[len("step"):]: f"runners.steps.{name}"
+    for _, name, _ in pkgutil.iter_modules([STEPS_DIR])
+    if name.startswith("step")
+}
+
+
 def run_step(step_number, *args):
-    steps_dir = os.path.join(os.path.dirname(__file__), "steps")
-    step_file = os.path.join(steps_dir, f"step{step_number}.py")
-    if not os.path.isfile(step_file):
-        print(f"Step file {step_file} not found.")
+    module_name = _STEP_MODULES.get(str(step_number))
+    if module_name is None:
+        print(f"Step {step_number} not found in {STEPS_DIR}.")
         sys.exit(1)
-    spec = importlib.util.spec_from_file_location(f"step{step_number}", step_file)
-    step_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(step_module)
+    step_module = importlib.import_module(module_name)
     if hasattr(step_module, "main"):
         main_func = step_module.main
         if inspect.iscoroutinefunction(main_func):
@@ -11,7 +11,8 @@ class PipelineBuildResponse(TypedDict, total=False):
     message: str | None
     dockerize_result: dict[str, Any]
     scheduling_result: dict[str, Any]
-    execution_time: int | None
+    execution_time: float | None  # seconds
+    step_timings_ms: dict[str, float]  # step number -> milliseconds
     error: str | None
 
 
@@ -4,7 +4,7 @@ import logging
 from shared.services.llm_service import LLMService
 from pipeline_builder.guards.prompt_guard_service import PromptGuardService
 from pipeline_builder import PipelineBuilderService
-from shared.services.storage_service import MinioStorage
+from shared.services.storage_service import get_minio_storage
 import logging
 
 from shared.utils.spinner_utils import run_step_with_spinner
@@ -16,9 +16,9 @@ class ChatService:
         self.llm_service = LLMService()
         self.prompt_guard_service = PromptGuardService(log=self.logger)
         self.pipeline_builder_service = PipelineBuilderService()
-        self.storage_service = MinioStorage()
+        self.storage_service = get_minio_storage()
 
-    async def process_message(self, raw_message: str, fast: bool = False, mode: str = "chat", run_after_deploy: bool = False) -> dict:
+    async def process_message(self, raw_message: str, fast: bool = False, mode: str = "chat", run_after_deploy: bool = False, use_cache: bool = True) -> dict:
         """
         Process the user message, validate it, and get a response from the LLM.
         """
@@ -39,7 +39,7 @@ class ChatService:
             self.logger.warning("Input blocked by guards.")
             return guard_result
         
-        build_spec = await self.pipeline_builder_service.build_pipeline(guard_result["cleaned_input"], fast=fast, mode=mode, run_after_deploy=run_after_deploy)
+        build_spec = await self.pipeline_builder_service.build_pipeline(guard_result["cleaned_input"], fast=fast, mode=mode, run_after_deploy=run_after_deploy, use_cache=use_cache)
                
         return {
             "guard_decision": "allow",
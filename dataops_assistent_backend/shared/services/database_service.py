@@ -205,6 +205,27 @@ class DatabaseService:
             self.logger.error(f"Sync query execution failed: {e}")
             raise
     
+    async def fetch_value(self, query: str, params: dict = None):
+        """Fetch the first column of the first row from a query asynchronously."""
+        try:
+            async with self.async_engine.connect() as connection:
+                result = await connection.execute(text(query), params or {})
+                return result.scalar()
+        except SQLAlchemyError as e:
+            self.logger.error(f"Async query execution failed: {e}")
+            # Fallback to sync version
+            return self.fetch_value_sync(query, params)
+
+    def fetch_value_sync(self, query: str, params: dict = None):
+        """Fetch the first column of the first row from a query synchronously (fallback)."""
+        try:
+            with self.engine.connect() as connection:
+                result = connection.execute(text(query), params or {})
+                return result.scalar()
+        except SQLAlchemyError as e:
+            self.logger.error(f"Sync query execution failed: {e}")
+            raise
+
     async def fetch_one_async(self, query: str, params: dict = None):
         """Fetch one result from a query asynchronously."""
         try:
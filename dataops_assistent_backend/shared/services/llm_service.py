@@ -9,6 +9,10 @@ from xml.parsers.expat import model
 import openai
 import asyncio
 
+# Model and sampling settings for Responses API calls
+RESPONSES_MODEL = "gpt-4.1"
+RESPONSES_TEMPERATURE = 0
+
 class LLMService:
     def __init__(self, provider: str = "openai", api_key: Optional[str] = None, model: str = "gpt-3.5-turbo"):
         self.provider = provider
@@ -33,9 +37,9 @@ class LLMService:
         if self.provider == "openai" and self.api_key and self.async_client:
             try:
                 response = await self.async_client.responses.create(
-                        model="gpt-4.1",
+                        model=RESPONSES_MODEL,
                         input=input,
-                        temperature=0,
+                        temperature=RESPONSES_TEMPERATURE,
                         text=text)
                 
                 return response
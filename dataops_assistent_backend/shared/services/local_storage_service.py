@@ -1,7 +1,8 @@
 import os
 import json
+import shutil
 import asyncio
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime
 
 
@@ -70,10 +71,10 @@ class LocalStorageService:
 
 		return await asyncio.to_thread(sync_store)
 	
-	async def retrieve_pipeline(self, pipeline_id: str) -> Dict[str, Any]:
+	async def retrieve_pipeline(self, pipeline_id: str, file_types: Optional[List[str]] = None) -> Dict[str, Any]:
 		"""
 		Retrieve pipeline by ID (no versioning, just files under pipelines/{pipeline_id}/).
-		Returns dict with all stored files' contents (no metadata).
+		Returns dict with all stored files' contents (no metadata), or only file_types when given.
 		"""
 		import traceback
 		try:
@@ -91,7 +92,7 @@ class LocalStorageService:
 
 			# Retrieve all stored files (skip metadata)
 			for file_type, file_path in metadata["stored_files"].items():
-				if file_type == "metadata":
+				if file_type == "metadata" or (file_types is not None and file_type not in file_types):
 					continue
 				if file_type in ["spec", "test_results"]:
 					# JSON files
@@ -109,4 +110,34 @@ class LocalStorageService:
 		except Exception as e:
 			import logging
 			logging.error(f"Error retrieving pipeline: {e}\n{traceback.format_exc()}")
-			raise
\ No newline at end of file
+			raise
+
+	async def retrieve_pipeline_to_dir(self, pipeline_id: str, dest_dir: str, files: Dict[str, str],
+									   on_file: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+		"""
+		Copy selected pipeline files into dest_dir (file type -> target file name).
+		Files that were not stored are created empty. Returns the pipeline metadata.
+		on_file, if given, is called with each file type once all files are copied.
+		"""
+
+		def sync_copy():
+			metadata_path = os.path.join(self.base_dir, pipeline_id, "metadata.json")
+			if not os.path.exists(metadata_path):
+				raise ValueError(f"No pipeline found for ID {pipeline_id}")
+			with open(metadata_path, "r", encoding="utf-8") as f:
+				metadata = json.load(f)
+
+			for file_type, file_name in files.items():
+				dest_path = os.path.join(dest_dir, file_name)
+				src_path = metadata["stored_files"].get(file_type)
+				if src_path:
+					shutil.copyfile(src_path, dest_path)
+				else:
+					open(dest_path, "wb").close()
+			return metadata
+
+		metadata = await asyncio.to_thread(sync_copy)
+		if on_file:
+			for file_type in files:
+				on_file(file_type)
+		return metadata
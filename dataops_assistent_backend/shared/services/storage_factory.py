@@ -2,7 +2,7 @@ import os
 import logging
 from typing import Union
 from functools import lru_cache
-from .storage_service import MinioStorage
+from .storage_service import MinioStorage, get_minio_storage
 from .local_storage_service import LocalStorageService
 
 
@@ -30,12 +30,12 @@ def get_storage_service() -> Union[MinioStorage, LocalStorageService]:
 
     elif environment in ["dev", "development"]:
         logger.info("Using MinioStorage for development environment")
-        return MinioStorage()
+        return get_minio_storage()
 
     elif environment in ["prod", "production"]:
         logger.info("Using MinioStorage (S3) for production environment")
-        return MinioStorage()
+        return get_minio_storage()
 
     else:
         logger.warning(f"Unknown environment '{environment}', defaulting to MinioStorage")
-        return MinioStorage()
+        return get_minio_storage()
@@ -1,21 +1,92 @@
 import os
 import time
-import re
+import shutil
+import hashlib
+import tempfile
+import threading
+import string
+import gzip
 import json
 import asyncio
 import logging
-from typing import Optional, Dict, Any, List
-from datetime import datetime
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Callable
+from datetime import datetime, timezone
 
 import boto3
+import aioboto3
 from botocore.client import Config as BotoConfig
 from botocore.exceptions import ClientError
 
-SAFE_NAME = re.compile(r"[^A-Za-z0-9._+-]")
+from shared.utils.json_utils import safe_json_bytes
+
+# Maps every Latin-1 character outside [A-Za-z0-9._+-] to "-"; non-ASCII is folded to "?" first
+_SAFE_CHARS = frozenset(string.ascii_letters + string.digits + "._+-")
+_SAFE_NAME_TABLE = str.maketrans({chr(c): "-" for c in range(256) if chr(c) not in _SAFE_CHARS})
+
+# Local cache of downloaded pipeline objects, hardlinked into test/build dirs.
+# Pipeline files live under versioned keys that are never rewritten, so a key's bytes never change.
+BLOB_CACHE_DIR = os.path.expanduser(
+    os.getenv("DATAOPS_BLOB_CACHE_DIR", os.path.join(os.getenv("DATAOPS_CACHE_DIR", "~/.cache/dataops"), "blobs"))
+)
+# Test staging dirs live next to the blob cache, on the same filesystem, so cached files are hardlinked into them
+STAGING_DIR = os.path.join(os.path.dirname(BLOB_CACHE_DIR.rstrip(os.sep)), "staging")
+# Blobs unused for longer than this are evicted, then the least recently used ones until the cache fits
+BLOB_CACHE_MAX_BYTES = int(os.getenv("DATAOPS_BLOB_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+BLOB_CACHE_MAX_AGE_SECONDS = int(os.getenv("DATAOPS_BLOB_CACHE_MAX_AGE_SECONDS", str(7 * 24 * 60 * 60)))
+# Eviction walks the whole cache, so it runs at most this often (on cache misses)
+BLOB_CACHE_SWEEP_INTERVAL_SECONDS = 60
+_blob_sweep_lock = threading.Lock()
+_last_blob_sweep = 0.0
+
+# Buckets already checked/created in this process, keyed by (endpoint, bucket)
+_VERIFIED_BUCKETS = set()
+_VERIFIED_BUCKETS_LOCK = threading.Lock()
+
+# gzip level for stored JSON objects; low levels already get most of the ratio on JSON
+JSON_GZIP_LEVEL = 3
+
+# Size of the shared urllib3 connection pool; concurrent reads/writes reuse these connections
+MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "50"))
+
+def _client_config(use_path_style: bool) -> BotoConfig:
+    return BotoConfig(
+        s3={"addressing_style": "path" if use_path_style else "auto"},
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        # Keep idle pooled connections alive between bursts of requests
+        tcp_keepalive=True,
+        retries={"mode": "adaptive", "max_attempts": 5},
+    )
+
+
+@lru_cache(maxsize=8)
+def _get_client(endpoint_url: Optional[str], region: str, access_key: str, secret_key: str, use_path_style: bool):
+    """Sync boto3 S3 client shared by every MinioStorage with the same connection settings."""
+    return boto3.client(
+        "s3",
+        endpoint_url=endpoint_url,
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        region_name=region,
+        config=_client_config(use_path_style),
+    )
+
+
+def _new_version_id() -> str:
+    """
+    Local-time second timestamp plus its nanosecond remainder, e.g. 20240101_120000_123456789.
+    Local time like the existing second-resolution ids, so the two still sort together
+    chronologically; the remainder keeps two versions stored within the same second apart.
+    """
+    ns = time.time_ns()
+    seconds, remainder = divmod(ns, 1_000_000_000)
+    return f"{datetime.fromtimestamp(seconds):%Y%m%d_%H%M%S}_{remainder:09d}"
+
 
 def sanitize_filename(name: str) -> str:
     base = name.split("/")[-1]
-    safe = SAFE_NAME.sub("-", base)
+    safe = base.encode("ascii", "replace").decode("ascii").translate(_SAFE_NAME_TABLE)
     return safe or f"file-{int(time.time())}"
 
 
@@ -39,32 +110,21 @@ class MinioStorage:
         # For real AWS S3, endpoint_url should be None. For MinIO, use the endpoint.
         endpoint_url = None if not self.endpoint or self.endpoint.lower() in ["", "none"] else self.endpoint
         self.logger.info(f"Initializing MinIO Storage with endpoint: {endpoint_url}, bucket: {self.bucket}")
-        self.client = boto3.client(
-            "s3",
+        self._client_kwargs = dict(
             endpoint_url=endpoint_url,
             aws_access_key_id=self.access_key,
             aws_secret_access_key=self.secret_key,
             region_name=self.region,
-            config=BotoConfig(s3={"addressing_style": "path" if self.use_path_style else "auto"}),
+            config=_client_config(self.use_path_style),
         )
+        # Sync client: startup bucket check and streaming downloads into the blob cache (run in a thread)
+        self.client = _get_client(endpoint_url, self.region, self.access_key, self.secret_key, self.use_path_style)
+        # Async clients for request-path I/O; opened lazily, one per event loop (see _client)
+        self._session = aioboto3.Session()
+        self._async_clients = {}
 
         # Ensure main bucket exists
-        try:
-            self.client.head_bucket(Bucket=self.bucket)
-        except ClientError:
-            # Create bucket with proper LocationConstraint for AWS S3
-            try:
-                if self.region == 'us-east-1':
-                    # us-east-1 doesn't use LocationConstraint
-                    self.client.create_bucket(Bucket=self.bucket)
-                else:
-                    # Other regions require LocationConstraint
-                    self.client.create_bucket(
-                        Bucket=self.bucket,
-                        CreateBucketConfiguration={'LocationConstraint': self.region}
-                    )
-            except ClientError as e:
-                raise RuntimeError(f"Failed to ensure bucket '{self.bucket}': {e}")
+        self._ensure_bucket()
 
         # Initialize pipeline prefixes (all in single bucket)
         self.pipeline_prefixes = {
@@ -75,6 +135,74 @@ class MinioStorage:
             "pipeline-logs": "pipeline-logs"    # Execution logs
         }
 
+    def _ensure_bucket(self):
+        """Check (and if missing, create) the main bucket once per process per endpoint."""
+        bucket_key = (self.endpoint, self.bucket)
+        with _VERIFIED_BUCKETS_LOCK:
+            if bucket_key in _VERIFIED_BUCKETS:
+                return
+            try:
+                self.client.head_bucket(Bucket=self.bucket)
+            except ClientError as e:
+                # Only a missing bucket warrants a create; auth/transient errors are raised as is
+                if e.response['Error']['Code'] not in ('404', 'NoSuchBucket', 'NotFound'):
+                    raise RuntimeError(f"Failed to check bucket '{self.bucket}': {e}")
+                # Create bucket with proper LocationConstraint for AWS S3
+                try:
+                    if self.region == 'us-east-1':
+                        # us-east-1 doesn't use LocationConstraint
+                        self.client.create_bucket(Bucket=self.bucket)
+                    else:
+                        # Other regions require LocationConstraint
+                        self.client.create_bucket(
+                            Bucket=self.bucket,
+                            CreateBucketConfiguration={'LocationConstraint': self.region}
+                        )
+                except ClientError as e:
+                    raise RuntimeError(f"Failed to ensure bucket '{self.bucket}': {e}")
+            _VERIFIED_BUCKETS.add(bucket_key)
+
+    @asynccontextmanager
+    async def _client(self):
+        """Yield the aioboto3 S3 client for the running event loop, opening it on first use."""
+        loop = asyncio.get_running_loop()
+        # aiohttp sessions are bound to their loop (asyncio.run in scripts starts a new one),
+        # so each loop gets its own client; close() shuts all of them down
+        entry = self._async_clients.get(loop)
+        if entry is None:
+            self._drop_closed_loop_clients()
+            entry = self._async_clients.setdefault(loop, {"lock": asyncio.Lock(), "cm": None, "client": None})
+        async with entry["lock"]:
+            if entry["client"] is None:
+                entry["cm"] = self._session.client("s3", **self._client_kwargs)
+                entry["client"] = await entry["cm"].__aenter__()
+        yield entry["client"]
+
+    def _drop_closed_loop_clients(self):
+        # A client whose loop has already been closed can no longer be awaited; only drop it
+        for loop in [loop for loop in self._async_clients if loop.is_closed()]:
+            self.logger.warning("Dropping S3 client of a closed event loop; close() was not called before it ended")
+            del self._async_clients[loop]
+
+    async def close(self):
+        """Close the async clients' connection pools, on whichever event loop each belongs to."""
+        current = asyncio.get_running_loop()
+        while self._async_clients:
+            loop, entry = self._async_clients.popitem()
+            if entry["cm"] is None:
+                continue
+            try:
+                if loop is current:
+                    await entry["cm"].__aexit__(None, None, None)
+                elif loop.is_running():
+                    await asyncio.wrap_future(
+                        asyncio.run_coroutine_threadsafe(entry["cm"].__aexit__(None, None, None), loop)
+                    )
+                else:
+                    self.logger.warning("Dropping S3 client of an event loop that is no longer running")
+            except Exception as e:
+                self.logger.error(f"Failed to close S3 client: {e}")
+
     # Pipeline Management Methods
     async def initialize_pipeline_buckets(self):
         """Initialize main bucket for pipeline storage (single bucket with prefixes)"""
@@ -84,62 +212,43 @@ class MinioStorage:
     async def store_pipeline(self, pipeline_id: str, pipeline_data: Dict[str, Any]) -> Dict[str, str]:
         """Store complete pipeline with versioning"""
         stored_files = {}
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = _new_version_id()
 
         try:
             self.logger.info(f"Storing pipeline {pipeline_id} with version {timestamp}")
 
             pipeline_path = f"{pipeline_id}/v{timestamp}"
-            # Store pipeline code
-            if 'pipeline' in pipeline_data:
-                code_path = f"pipeline-code/{pipeline_path}/pipeline.py"
-                await self._store_text_file(code_path, pipeline_data['pipeline'])
-                stored_files['pipeline'] = f"s3://{self.bucket}/{code_path}"
-
-            # Store requirements.txt
-            if 'requirements' in pipeline_data:
-                req_path = f"pipeline-code/{pipeline_path}/requirements.txt"
-                await self._store_text_file(req_path, pipeline_data['requirements'])
-                stored_files['requirements'] = f"s3://{self.bucket}/{req_path}"
-
-            if 'test_code' in pipeline_data:
-                test_path = f"pipeline-tests/{pipeline_path}/test.py"
-                await self._store_text_file(test_path, pipeline_data['test_code'])
-                stored_files['test_code'] = f"s3://{self.bucket}/{test_path}"
-
-            if 'env_template' in pipeline_data:
-                env_path = f"pipeline-code/{pipeline_path}/.env"
-                await self._store_text_file(env_path, pipeline_data['env_template'])
-                stored_files['.env'] = f"s3://{self.bucket}/{env_path}"
-
-            if 'dockerfile' in pipeline_data:
-                dockerfile_path = f"pipeline-code/{pipeline_path}/Dockerfile"
-                await self._store_text_file(dockerfile_path, pipeline_data['dockerfile'])
-                stored_files['dockerfile'] = f"s3://{self.bucket}/{dockerfile_path}"
-
-            # Store pipeline specification
-            if 'spec' in pipeline_data:
-                spec_path = f"pipeline-specs/{pipeline_id}/v{timestamp}/spec.json"
-                await self._store_json_file(spec_path, pipeline_data['spec'])
-                stored_files['spec'] = f"s3://{self.bucket}/{spec_path}"
-
-            # Store test results (if provided)
-            if 'test_results' in pipeline_data:
-                results_path = f"pipeline-tests/{pipeline_id}/v{timestamp}/test_results.json"
-                await self._store_json_file(results_path, pipeline_data['test_results'])
-                stored_files['test_results'] = f"s3://{self.bucket}/{results_path}"
-
-            # Store execution logs (if provided)
-            if 'logs' in pipeline_data:
-                logs_path = f"pipeline-logs/{pipeline_id}/v{timestamp}/execution.log"
-                await self._store_text_file(logs_path, pipeline_data['logs'])
-                stored_files['logs'] = f"s3://{self.bucket}/{logs_path}"
+            text_files = {
+                # file type: (data key, object path)
+                'pipeline': ('pipeline', f"pipeline-code/{pipeline_path}/pipeline.py"),
+                'requirements': ('requirements', f"pipeline-code/{pipeline_path}/requirements.txt"),
+                'test_code': ('test_code', f"pipeline-tests/{pipeline_path}/test.py"),
+                '.env': ('env_template', f"pipeline-code/{pipeline_path}/.env"),
+                'dockerfile': ('dockerfile', f"pipeline-code/{pipeline_path}/Dockerfile"),
+                'logs': ('logs', f"pipeline-logs/{pipeline_id}/v{timestamp}/execution.log"),
+            }
+            json_files = {
+                'spec': ('spec', f"pipeline-specs/{pipeline_id}/v{timestamp}/spec.json"),
+                'test_results': ('test_results', f"pipeline-tests/{pipeline_id}/v{timestamp}/test_results.json"),
+            }
+
+            # The uploads are independent, so issue them concurrently
+            uploads = []
+            for file_type, (key, path) in text_files.items():
+                if key in pipeline_data:
+                    uploads.append(self._store_text_file(path, pipeline_data[key]))
+                    stored_files[file_type] = f"s3://{self.bucket}/{path}"
+            for file_type, (key, path) in json_files.items():
+                if key in pipeline_data:
+                    uploads.append(self._store_json_file(path, pipeline_data[key]))
+                    stored_files[file_type] = f"s3://{self.bucket}/{path}"
+            await asyncio.gather(*uploads)
 
             # Store metadata
             metadata = {
                 "pipeline_id": pipeline_id,
                 "version": timestamp,
-                "created_at": datetime.now().isoformat(),
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
                 "stored_files": stored_files,
                 "file_count": len(stored_files)
             }
@@ -154,8 +263,9 @@ class MinioStorage:
             self.logger.error(f"Error storing pipeline: {e}")
             raise
 
-    async def retrieve_pipeline(self, pipeline_id: str, version: Optional[str] = None) -> Dict[str, Any]:
-        """Retrieve pipeline by ID and version"""
+    async def retrieve_pipeline(self, pipeline_id: str, version: Optional[str] = None,
+                                file_types: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Retrieve pipeline by ID and version; only file_types (plus metadata) when given"""
         try:
             # If no version specified, get the latest
             if not version:
@@ -170,15 +280,27 @@ class MinioStorage:
 
             pipeline_data = {"metadata": metadata}
 
-            # Retrieve all stored files
+            # Retrieve all stored files concurrently
+            fetches = {}
             for file_type, s3_path in metadata["stored_files"].items():
-                if file_type != "metadata":
+                if file_type != "metadata" and (file_types is None or file_type in file_types):
                     bucket, path = self._parse_s3_path(s3_path)
 
                     if file_type in ["spec", "test_results"]:
-                        pipeline_data[file_type] = await self._retrieve_json_file(path)
+                        fetches[file_type] = self._retrieve_json_file(path)
                     else:
-                        pipeline_data[file_type] = await self._retrieve_text_file(path)
+                        fetches[file_type] = self._retrieve_text_file(path)
+
+            # Let every fetch finish before failing, so none is left running unawaited
+            results = await asyncio.gather(*fetches.values(), return_exceptions=True)
+            errors = [(file_type, result) for file_type, result in zip(fetches, results) if isinstance(result, Exception)]
+            for file_type, error in errors:
+                self.logger.error(f"Error retrieving {file_type} for pipeline {pipeline_id}: {error}")
+            # A file that can't be read fails the retrieval, as before; callers must not
+            # build or test with it silently missing
+            if errors:
+                raise errors[0][1]
+            pipeline_data.update(zip(fetches, results))
 
             return pipeline_data
 
@@ -186,21 +308,123 @@ class MinioStorage:
             self.logger.error(f"Error retrieving pipeline: {e}")
             raise
 
+    async def retrieve_pipeline_to_dir(self, pipeline_id: str, dest_dir: str, files: Dict[str, str],
+                                       version: Optional[str] = None,
+                                       on_file: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Stream selected pipeline files straight into dest_dir without holding them in memory.
+        files maps stored file types to target file names, e.g. {"pipeline": "pipeline.py"}.
+        Files missing from the stored version are created empty. Returns the version metadata.
+        on_file, if given, is called with each file type as soon as that file is written.
+        """
+        if not version:
+            version = await self._get_latest_version(pipeline_id)
+
+        if not version:
+            raise ValueError(f"No pipeline found for ID {pipeline_id}")
+
+        metadata_path = f"pipelines/{pipeline_id}/v{version}/metadata.json"
+        metadata = await self._retrieve_json_file(metadata_path)
+        stored_files = metadata["stored_files"]
+
+        async def fetch(file_type: str, file_name: str):
+            s3_path = stored_files.get(file_type)
+            path = self._parse_s3_path(s3_path)[1] if s3_path else None
+            await asyncio.to_thread(self._download_to_file, path, os.path.join(dest_dir, file_name))
+            if on_file:
+                on_file(file_type)
+
+        await asyncio.gather(*(fetch(file_type, file_name) for file_type, file_name in files.items()))
+        return metadata
+
+    def _download_to_file(self, path: Optional[str], dest_path: str):
+        """Place an object from the main bucket at dest_path via the blob cache (empty file if path is None)"""
+        if path is None:
+            open(dest_path, "wb").close()
+            return
+        blob_path = self._cached_blob(path)
+        # Hardlinks only work within a filesystem; destinations elsewhere get a plain copy
+        if os.stat(blob_path).st_dev == os.stat(os.path.dirname(dest_path) or ".").st_dev:
+            os.link(blob_path, dest_path)
+        else:
+            shutil.copyfile(blob_path, dest_path)
+
+    def _blob_dir(self, pipeline_id: str) -> str:
+        """Cache directory holding every blob of one pipeline, so deleting the pipeline can purge them"""
+        return os.path.join(BLOB_CACHE_DIR, hashlib.sha256(f"{self.bucket}/{pipeline_id}".encode()).hexdigest())
+
+    def _cached_blob(self, path: str, chunk_size: int = 64 * 1024) -> str:
+        """Return the local blob for an object key, downloading it in fixed-size chunks on a miss"""
+        # Keys look like {prefix}/{pipeline_id}/v{version}/{file}
+        blob_dir = self._blob_dir(path.split("/")[1] if path.count("/") >= 2 else "")
+        blob_path = os.path.join(blob_dir, hashlib.sha256(f"{self.bucket}/{path}".encode()).hexdigest())
+        try:
+            # mtime doubles as the last-use time for eviction
+            os.utime(blob_path)
+            return blob_path
+        except FileNotFoundError:
+            pass
+
+        os.makedirs(blob_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=blob_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                response = self.client.get_object(Bucket=self.bucket, Key=path)
+                for chunk in response['Body'].iter_chunks(chunk_size):
+                    f.write(chunk)
+            # Atomic publish; concurrent downloads of the same key just replace each other
+            os.replace(tmp_path, blob_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._evict_blobs()
+        return blob_path
+
+    def _evict_blobs(self):
+        """Drop expired blobs, then the least recently used ones until the cache is under its size cap"""
+        global _last_blob_sweep
+        with _blob_sweep_lock:
+            now = time.time()
+            if now - _last_blob_sweep < BLOB_CACHE_SWEEP_INTERVAL_SECONDS:
+                return
+            _last_blob_sweep = now
+
+        blobs = []
+        for dirpath, _, filenames in os.walk(BLOB_CACHE_DIR):
+            for name in filenames:
+                # In-flight downloads are left alone
+                if name.endswith(".part"):
+                    continue
+                blob_path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(blob_path)
+                except FileNotFoundError:
+                    continue
+                blobs.append((st.st_mtime, st.st_size, blob_path))
+
+        # Files already linked into test/build dirs keep their data; only the cache entry goes.
+        # Blobs used since the last sweep are kept, so one being handed out right now isn't removed
+        total = sum(size for _, size, _ in blobs)
+        for mtime, size, blob_path in sorted(blobs):
+            if now - mtime <= BLOB_CACHE_MAX_AGE_SECONDS and total <= BLOB_CACHE_MAX_BYTES:
+                break
+            if now - mtime < BLOB_CACHE_SWEEP_INTERVAL_SECONDS:
+                break
+            try:
+                os.unlink(blob_path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
     async def list_pipeline_versions(self, pipeline_id: str) -> List[Dict[str, Any]]:
         """List all versions of a pipeline"""
         try:
             prefix = f"pipelines/{pipeline_id}/"
 
-            # List objects in main bucket
-            response = await asyncio.to_thread(
-                self.client.list_objects_v2,
-                Bucket=self.bucket,
-                Prefix=prefix
-            )
-
             versions = []
-            if 'Contents' in response:
-                for obj in response['Contents']:
+            # List objects in main bucket (all pages)
+            async for page in self._list_pages(prefix):
+                for obj in page.get('Contents', []):
                     if obj['Key'].endswith("/metadata.json"):
                         # Extract version from path: pipelines/{pipeline_id}/v{timestamp}/metadata.json
                         path_parts = obj['Key'].split("/")
@@ -226,17 +450,28 @@ class MinioStorage:
     async def delete_pipeline(self, pipeline_id: str, version: Optional[str] = None):
         """Delete pipeline versions"""
         try:
-            # Delete from all prefix locations
+            # Delete from all prefix locations concurrently; the prefixes don't overlap
             if version:
                 self.logger.info(f"Deleting pipeline {pipeline_id} version {version}")
-                for prefix_name in self.pipeline_prefixes.values():
-                    full_prefix = f"{prefix_name}/{pipeline_id}/v{version}/"
-                    await self._delete_objects_with_prefix(full_prefix)
+                prefixes = [f"{prefix_name}/{pipeline_id}/v{version}/" for prefix_name in self.pipeline_prefixes.values()]
             else:
                 self.logger.info(f"Deleting all versions of pipeline {pipeline_id}")
-                for prefix_name in self.pipeline_prefixes.values():
-                    full_prefix = f"{prefix_name}/{pipeline_id}/"
-                    await self._delete_objects_with_prefix(full_prefix)
+                prefixes = [f"{prefix_name}/{pipeline_id}/" for prefix_name in self.pipeline_prefixes.values()]
+
+            results = await asyncio.gather(
+                *(self._delete_objects_with_prefix(prefix) for prefix in prefixes),
+                return_exceptions=True
+            )
+            # Finish every prefix before reporting failures
+            errors = [(prefix, result) for prefix, result in zip(prefixes, results) if isinstance(result, Exception)]
+            for prefix, error in errors:
+                self.logger.error(f"Error deleting objects under {prefix}: {error}")
+            if errors:
+                raise errors[0][1]
+
+            # Cached blobs are kept per pipeline, so a version delete purges the whole pipeline's
+            # blobs; the remaining versions are downloaded again on next use
+            await asyncio.to_thread(shutil.rmtree, self._blob_dir(pipeline_id), True)
 
             self.logger.info(f"Deleted pipeline {pipeline_id}" + (f" version {version}" if version else " (all versions)"))
 
@@ -244,37 +479,45 @@ class MinioStorage:
             self.logger.error(f"Error deleting pipeline: {e}")
             raise
 
+    async def _store_bytes(self, path: str, data: bytes, content_type: str, content_encoding: Optional[str] = None):
+        """Store raw bytes as file in main bucket"""
+        extra = {'ContentEncoding': content_encoding} if content_encoding else {}
+        async with self._client() as client:
+            await client.put_object(
+                Bucket=self.bucket,
+                Key=path,
+                Body=data,
+                ContentType=content_type,
+                **extra
+            )
+
     async def _store_text_file(self, path: str, content: str):
         """Store text content as file in main bucket"""
-        content_bytes = content.encode('utf-8')
-
-        await asyncio.to_thread(
-            self.client.put_object,
-            Bucket=self.bucket,
-            Key=path,
-            Body=content_bytes,
-            ContentType='text/plain'
-        )
+        await self._store_bytes(path, content.encode('utf-8'), 'text/plain')
 
     async def _store_json_file(self, path: str, data: Dict[str, Any]):
-        """Store JSON data as file in main bucket"""
-        json_content = json.dumps(data, indent=2, default=str)
-        await self._store_text_file(path, json_content)
+        """Store JSON data as a compact, gzip-encoded file in main bucket"""
+        payload = gzip.compress(safe_json_bytes(data), compresslevel=JSON_GZIP_LEVEL)
+        await self._store_bytes(path, payload, 'application/json', content_encoding='gzip')
 
     async def _retrieve_text_file(self, path: str) -> str:
         """Retrieve text file content from main bucket"""
-        response = await asyncio.to_thread(
-            self.client.get_object,
-            Bucket=self.bucket,
-            Key=path
-        )
-        content = response['Body'].read().decode('utf-8')
-        return content
+        return (await self._retrieve_bytes(path)).decode('utf-8')
 
     async def _retrieve_json_file(self, path: str) -> Dict[str, Any]:
         """Retrieve JSON file content from main bucket"""
-        content = await self._retrieve_text_file(path)
-        return json.loads(content)
+        return json.loads(await self._retrieve_bytes(path))
+
+    async def _retrieve_bytes(self, path: str) -> bytes:
+        """Retrieve an object's bytes from main bucket, undoing gzip content encoding"""
+        async with self._client() as client:
+            response = await client.get_object(Bucket=self.bucket, Key=path)
+            async with response['Body'] as stream:
+                content = await stream.read()
+        # Objects written before JSON compression (or already decoded in transit) are plain
+        if response.get('ContentEncoding') == 'gzip' and content[:2] == b'\x1f\x8b':
+            content = gzip.decompress(content)
+        return content
 
     async def _get_latest_version(self, pipeline_id: str) -> Optional[str]:
         """Get the latest version of a pipeline"""
@@ -284,29 +527,38 @@ class MinioStorage:
     async def _delete_objects_with_prefix(self, prefix: str):
         """Delete all objects with given prefix in main bucket"""
         try:
-            response = await asyncio.to_thread(
-                self.client.list_objects_v2,
-                Bucket=self.bucket,
-                Prefix=prefix
-            )
-
-            if 'Contents' in response:
-                # Delete objects in batches
-                objects_to_delete = [{'Key': obj['Key']} for obj in response['Contents']]
-
-                if objects_to_delete:
-                    await asyncio.to_thread(
-                        self.client.delete_objects,
-                        Bucket=self.bucket,
-                        Delete={'Objects': objects_to_delete}
-                    )
-                    self.logger.debug(f"Deleted {len(objects_to_delete)} objects from {self.bucket}/{prefix}")
+            async with self._client() as client:
+                deletes = []
+                async for page in self._list_pages(prefix):
+                    # delete_objects takes at most 1000 keys per call
+                    objects_to_delete = [{'Key': obj['Key']} for obj in page.get('Contents', [])]
+                    for start in range(0, len(objects_to_delete), 1000):
+                        deletes.append(client.delete_objects(
+                            Bucket=self.bucket,
+                            # Quiet: the response only lists keys that failed
+                            Delete={'Objects': objects_to_delete[start:start + 1000], 'Quiet': True}
+                        ))
+                if deletes:
+                    responses = await asyncio.gather(*deletes)
+                    errors = [error for response in responses for error in response.get('Errors', [])]
+                    if errors:
+                        # Objects are still there, so the delete must not be reported as done
+                        self.logger.error(f"Failed to delete {len(errors)} objects from {self.bucket}/{prefix}: {errors[:5]}")
+                        raise RuntimeError(f"Failed to delete {len(errors)} objects under {prefix}")
+                    self.logger.debug(f"Deleted objects from {self.bucket}/{prefix} in {len(deletes)} batches")
 
         except ClientError as e:
             # Ignore if bucket doesn't exist or is empty
             if e.response['Error']['Code'] not in ['NoSuchBucket', 'NoSuchKey']:
                 raise
 
+    async def _list_pages(self, prefix: str):
+        """Yield every list_objects_v2 page under prefix (each page holds at most 1000 keys)"""
+        async with self._client() as client:
+            paginator = client.get_paginator('list_objects_v2')
+            async for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+                yield page
+
     def _parse_s3_path(self, s3_path: str) -> tuple:
         """Parse S3 path into bucket and object path"""
         # s3://bucket-name/path/to/object
@@ -317,34 +569,34 @@ class MinioStorage:
     async def get_storage_status(self) -> Dict[str, Any]:
         """Get storage status and bucket information"""
         try:
-            prefix_status = {}
-
-            # Check main bucket exists
-            try:
-                await asyncio.to_thread(self.client.head_bucket, Bucket=self.bucket)
-                bucket_exists = True
-            except ClientError:
-                bucket_exists = False
-
-            # Count objects per prefix
-            if bucket_exists:
-                for prefix_name, prefix_key in self.pipeline_prefixes.items():
+            async def head_bucket() -> bool:
+                async with self._client() as client:
                     try:
-                        response = await asyncio.to_thread(
-                            self.client.list_objects_v2,
-                            Bucket=self.bucket,
-                            Prefix=f"{prefix_key}/"
-                        )
-
-                        object_count = response.get('KeyCount', 0)
-                        total_size = sum(obj.get('Size', 0) for obj in response.get('Contents', []))
-
-                        prefix_status[prefix_name] = {
-                            "object_count": object_count,
-                            "total_size": total_size
-                        }
-                    except ClientError as e:
-                        prefix_status[prefix_name] = {"error": str(e)}
+                        await client.head_bucket(Bucket=self.bucket)
+                        return True
+                    except ClientError:
+                        return False
+
+            async def probe(prefix_key: str) -> Dict[str, Any]:
+                try:
+                    object_count = 0
+                    total_size = 0
+                    async for page in self._list_pages(f"{prefix_key}/"):
+                        object_count += page.get('KeyCount', 0)
+                        total_size += sum(obj.get('Size', 0) for obj in page.get('Contents', []))
+                    return {
+                        "object_count": object_count,
+                        "total_size": total_size
+                    }
+                except ClientError as e:
+                    return {"error": str(e)}
+
+            # Check the bucket and count objects per prefix concurrently
+            bucket_exists, *counts = await asyncio.gather(
+                head_bucket(),
+                *(probe(prefix_key) for prefix_key in self.pipeline_prefixes.values())
+            )
+            prefix_status = dict(zip(self.pipeline_prefixes, counts)) if bucket_exists else {}
 
             return {
                 "status": "connected" if bucket_exists else "error",
@@ -360,3 +612,12 @@ class MinioStorage:
                 "status": "error",
                 "error": str(e)
             }
+
+
+@lru_cache(maxsize=1)
+def get_minio_storage() -> MinioStorage:
+    """
+    Shared MinioStorage instance, so every service reuses one client and its connection pool.
+    Built on first use; the bucket check in __init__ runs once per process.
+    """
+    return MinioStorage()
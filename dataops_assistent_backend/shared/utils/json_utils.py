@@ -2,11 +2,53 @@
 JSON utilities for handling serialization of complex Python objects.
 """
 
+import sys
 import json
-import numpy as np
+import orjson
 from datetime import datetime, date, time
 from decimal import Decimal
-import pandas as pd
+
+# numpy/pandas cost hundreds of ms to import, so make_json_serializable loads them on first use
+# (orjson serializes numpy natively and never needs them)
+np = None
+pd = None
+
+
+def _identity(obj):
+    return obj
+
+
+def _isoformat(obj):
+    return obj.isoformat()
+
+
+# Exact-type handlers for the common leaves; subclasses fall through to the isinstance chain
+_HANDLERS = {
+    str: _identity,
+    int: _identity,
+    bool: _identity,
+    float: lambda obj: None if obj != obj else obj,
+    Decimal: float,
+    datetime: _isoformat,
+    date: _isoformat,
+    time: _isoformat,
+}
+
+
+def _load_numpy():
+    """Import numpy/pandas and register handlers for the common numpy types."""
+    global np, pd
+    import numpy
+    import pandas
+
+    _HANDLERS.update({
+        numpy.int64: int,
+        numpy.int32: int,
+        numpy.float64: float,
+        numpy.float32: float,
+        numpy.ndarray: lambda obj: obj.tolist(),
+    })
+    np, pd = numpy, pandas
 
 
 def make_json_serializable(obj):
@@ -29,10 +71,17 @@ def make_json_serializable(obj):
         >>> make_json_serializable([np.int64(42), np.float64(3.14)])
         [42, 3.14]
     """
+    if np is None:
+        _load_numpy()
     if isinstance(obj, list):
         return [make_json_serializable(item) for item in obj]
     elif isinstance(obj, dict):
         return {key: make_json_serializable(value) for key, value in obj.items()}
+    handler = _HANDLERS.get(type(obj))
+    if handler is not None:
+        return handler(obj)
+    if obj is None or obj is pd.NaT or obj is pd.NA:
+        return None
     elif isinstance(obj, (np.integer, np.int64, np.int32)):
         return int(obj)
     elif isinstance(obj, (np.floating, np.float64, np.float32)):
@@ -45,7 +94,73 @@ def make_json_serializable(obj):
         return obj.isoformat()
     elif isinstance(obj, time):
         return obj.isoformat()
-    elif pd.isna(obj) or obj is None or (isinstance(obj, float) and np.isnan(obj)):
+    elif isinstance(obj, float) and obj != obj:
+        # NaN is the only value not equal to itself
         return None
     else:
-        return obj
\ No newline at end of file
+        return obj
+
+def _orjson_default(obj):
+    """Fallback for types orjson does not serialize natively."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    # NaT can only exist once something else has imported pandas
+    pandas = sys.modules.get("pandas")
+    if pandas is not None and obj is pandas.NaT:
+        return None
+    if isinstance(obj, (datetime, date, time)):
+        # pandas Timestamp and other datetime subclasses
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def to_json_bytes(obj) -> bytes:
+    """
+    Serialize obj straight to JSON bytes with orjson.
+
+    Handles the same types as make_json_serializable (numpy scalars/arrays, Decimal,
+    datetime/date/time, NaN/NaT as null) in a single C-level pass.
+
+    Examples:
+        >>> import numpy as np
+        >>> to_json_bytes([np.int64(42), np.float64(3.14)])
+        b'[42,3.14]'
+    """
+    return orjson.dumps(obj, default=_orjson_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _safe_default(obj):
+    """orjson fallback that stringifies anything unknown, like json.dumps(default=str)."""
+    try:
+        return _orjson_default(obj)
+    except TypeError:
+        return str(obj)
+
+
+def safe_json_bytes(obj, indent: bool = False) -> bytes:
+    """
+    Serialize obj to JSON bytes with orjson, never raising on unknown types.
+
+    Non-string dict keys are stringified and unknown objects fall back to str(obj).
+
+    Examples:
+        >>> from datetime import date
+        >>> safe_json_bytes({'date': date(2024, 1, 28), 1: 'one'})
+        b'{"date":"2024-01-28","1":"one"}'
+    """
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=_safe_default, option=option)
+
+
+def safe_json_dumps(obj, indent: bool = False) -> str:
+    """
+    Like safe_json_bytes, but returns a str.
+
+    Examples:
+        >>> from datetime import date
+        >>> safe_json_dumps({'date': date(2024, 1, 28), 1: 'one'})
+        '{"date":"2024-01-28","1":"one"}'
+    """
+    return safe_json_bytes(obj, indent).decode()
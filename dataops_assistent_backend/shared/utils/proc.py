@@ -0,0 +1,60 @@
+"""
+Subprocess helpers that keep fork/exec off the event-loop thread.
+
+Processes are started with subprocess.Popen on a small persistent thread pool. With
+close_fds=False, no cwd and no preexec_fn, CPython uses posix_spawn instead of fork+exec.
+"""
+import os
+import asyncio
+import functools
+import subprocess
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+# Only the last lines of each stream are kept, bounding memory for chatty installs/tests
+MAX_OUTPUT_LINES = 10_000
+
+# Spawning is short; waiting on output happens in the default executor instead
+_SPAWN_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SUBPROCESS_SPAWN_THREADS", "4")),
+    thread_name_prefix="spawn",
+)
+
+
+async def spawn(argv: list, **kwargs) -> subprocess.Popen:
+    """Start argv on the spawn pool and return the Popen handle."""
+    kwargs.setdefault("close_fds", False)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_SPAWN_POOL, functools.partial(subprocess.Popen, argv, **kwargs))
+
+
+def _drain(stream, sink: collections.deque, log=None):
+    """Read stream line by line into sink, optionally teeing each line to log.debug."""
+    with stream:
+        for line in stream:
+            sink.append(line)
+            if log is not None:
+                log.debug(line.rstrip().decode(errors="replace"))
+
+
+async def run(argv: list, env: Optional[dict] = None, log=None) -> Tuple[int, bytes, bytes]:
+    """
+    Run argv to completion, returning (returncode, stdout, stderr).
+    Output is read as it is produced; only the last MAX_OUTPUT_LINES lines of each stream are returned.
+    """
+    proc = await spawn(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+    out = collections.deque(maxlen=MAX_OUTPUT_LINES)
+    err = collections.deque(maxlen=MAX_OUTPUT_LINES)
+    try:
+        await asyncio.gather(
+            asyncio.to_thread(_drain, proc.stdout, out, log),
+            asyncio.to_thread(_drain, proc.stderr, err, log),
+        )
+        returncode = await asyncio.to_thread(proc.wait)
+    except asyncio.CancelledError:
+        # Don't leave the process running (and writing) after its caller has given up on it
+        proc.kill()
+        await asyncio.to_thread(proc.wait)
+        raise
+    return returncode, b"".join(out), b"".join(err)
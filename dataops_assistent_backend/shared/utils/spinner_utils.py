@@ -1,11 +1,9 @@
 import shutil
 from yaspin import yaspin
 
-async def run_step_with_spinner(step_msg, step_number, coro, *args, status_col=65, color="cyan", **kwargs):
-    """
-    Run an async step with a CLI spinner, aligning the status to a fixed column.
-    Returns (result, error). If error is not None, result is None.
-    """
+
+def _step_text(step_msg, step_number, status_col):
+    """Return the spinner text for a step and the same text padded to the status column."""
     # Get terminal width, default to 80 if unavailable
     try:
         terminal_width = shutil.get_terminal_size().columns
@@ -22,6 +20,15 @@ async def run_step_with_spinner(step_msg, step_number, coro, *args, status_col=6
     if len(text) > status_col:
         text = text[:status_col-3] + "..."
     padded_text = text.ljust(status_col)
+    return text, padded_text
+
+
+async def run_step_with_spinner(step_msg, step_number, coro, *args, status_col=65, color="cyan", **kwargs):
+    """
+    Run an async step with a CLI spinner, aligning the status to a fixed column.
+    Returns (result, error). If error is not None, result is None.
+    """
+    text, padded_text = _step_text(step_msg, step_number, status_col)
 
     spinner = yaspin(text=text, color=color)
     spinner.start()
@@ -44,3 +51,40 @@ async def run_step_with_spinner(step_msg, step_number, coro, *args, status_col=6
             spinner.stop()
             print(f"✗ Step {step_number}: {step_msg} - Failed: {e}")
         return None, e
+
+
+class StepSpinner:
+    """
+    One CLI spinner shared by consecutive steps. Each step only swaps the spinner text and
+    writes its status line above it, so the spinner thread starts once instead of per step.
+    Call stop() when the steps are done.
+    """
+    def __init__(self, status_col=65, color="cyan"):
+        self.status_col = status_col
+        self._spinner = yaspin(color=color)
+        self._started = False
+
+    async def run(self, step_msg, step_number, coro, *args, **kwargs):
+        """Run an async step under the spinner. Returns (result, error). If error is not None, result is None."""
+        text, padded_text = _step_text(step_msg, step_number, self.status_col)
+        self._spinner.text = text
+        if not self._started:
+            self._spinner.start()
+            self._started = True
+        try:
+            result = await coro(*args, **kwargs)
+            self._spinner.write(f"\033[92m✔\033[0m {padded_text}\033[92mSuccess\033[0m")
+            return result, None
+        except Exception as e:
+            self._spinner.write(f"\033[91m✖\033[0m {padded_text}\033[91mFailed\033[0m")
+            return None, e
+
+    def write(self, text):
+        """Print a line above the spinner without garbling it."""
+        self._spinner.write(text)
+
+    def stop(self):
+        if self._started:
+            self._spinner.text = ''
+            self._spinner.stop()
+            self._started = False